@@ -0,0 +1,48 @@
+"""Add shipment totals
+
+Revision ID: 05b2959c50e6
+Revises: a29bcf1acda1
+Create Date: 2026-10-18 11:27:09.351846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05b2959c50e6'
+down_revision: Union[str, Sequence[str], None] = 'a29bcf1acda1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shipments', sa.Column('total_value', sa.Float(), server_default='0', nullable=False))
+    op.add_column('shipments', sa.Column('total_items', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('shipments', sa.Column('unique_products', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('shipments', sa.Column('total_weight_kg', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill from existing items
+    op.execute("""
+        UPDATE shipments SET
+            total_value = COALESCE((SELECT SUM(si.quantity * si.unit_price) FROM shipment_items si
+                                    WHERE si.shipment_id = shipments.id), 0),
+            total_items = COALESCE((SELECT SUM(si.quantity) FROM shipment_items si
+                                    WHERE si.shipment_id = shipments.id), 0),
+            unique_products = (SELECT COUNT(DISTINCT si.product_id) FROM shipment_items si
+                               WHERE si.shipment_id = shipments.id),
+            total_weight_kg = COALESCE((SELECT SUM(si.quantity * COALESCE(p.weight_kg, 0))
+                                        FROM shipment_items si JOIN products p ON p.id = si.product_id
+                                        WHERE si.shipment_id = shipments.id), 0)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('shipments', 'total_weight_kg')
+    op.drop_column('shipments', 'unique_products')
+    op.drop_column('shipments', 'total_items')
+    op.drop_column('shipments', 'total_value')
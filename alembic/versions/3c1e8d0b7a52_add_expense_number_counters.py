@@ -0,0 +1,41 @@
+"""Add expense number counters
+
+Revision ID: 3c1e8d0b7a52
+Revises: 05b2959c50e6
+Create Date: 2026-10-18 12:04:51.662210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e8d0b7a52'
+down_revision: Union[str, Sequence[str], None] = '05b2959c50e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expense_number_counters',
+    sa.Column('prefix', sa.String(length=20), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('prefix')
+    )
+
+    # Continue after the highest existing EXP-YYYY-NNNN number of each year
+    op.execute("""
+        INSERT INTO expense_number_counters (prefix, next_value)
+        SELECT SUBSTR(expense_number, 1, 8), MAX(CAST(SUBSTR(expense_number, 10) AS INTEGER)) + 1
+        FROM expenses
+        WHERE expense_number LIKE 'EXP-____-%'
+        GROUP BY SUBSTR(expense_number, 1, 8)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_number_counters')
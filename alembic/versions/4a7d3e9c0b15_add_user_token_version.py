@@ -0,0 +1,28 @@
+"""Add user token version
+
+Revision ID: 4a7d3e9c0b15
+Revises: e5a91f3b8c27
+Create Date: 2026-10-18 14:46:52.130477
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7d3e9c0b15'
+down_revision: Union[str, Sequence[str], None] = 'e5a91f3b8c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
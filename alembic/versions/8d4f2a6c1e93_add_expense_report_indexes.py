@@ -0,0 +1,30 @@
+"""Add expense report indexes
+
+Revision ID: 8d4f2a6c1e93
+Revises: 3c1e8d0b7a52
+Create Date: 2026-10-18 12:41:17.204583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a6c1e93'
+down_revision: Union[str, Sequence[str], None] = '3c1e8d0b7a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_expenses_vendor_id_expense_date', 'expenses', ['vendor_id', 'expense_date'], unique=False)
+    op.create_index('ix_expenses_shipment_id', 'expenses', ['shipment_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_shipment_id', table_name='expenses')
+    op.drop_index('ix_expenses_vendor_id_expense_date', table_name='expenses')
@@ -0,0 +1,52 @@
+"""Add hot query indexes
+
+Revision ID: a29bcf1acda1
+Revises: ff54e7da18b4
+Create Date: 2026-10-18 10:03:51.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a29bcf1acda1'
+down_revision: Union[str, Sequence[str], None] = 'ff54e7da18b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate stock rows into the oldest one before enforcing uniqueness
+    op.execute("""
+        UPDATE inventory SET
+            quantity = (SELECT SUM(d.quantity) FROM inventory d
+                        WHERE d.product_id = inventory.product_id AND d.location_id = inventory.location_id),
+            reserved_quantity = (SELECT SUM(d.reserved_quantity) FROM inventory d
+                                 WHERE d.product_id = inventory.product_id AND d.location_id = inventory.location_id)
+        WHERE id IN (SELECT MIN(id) FROM inventory GROUP BY product_id, location_id HAVING COUNT(*) > 1)
+    """)
+    op.execute("""
+        DELETE FROM inventory
+        WHERE id NOT IN (SELECT MIN(id) FROM inventory GROUP BY product_id, location_id)
+    """)
+
+    op.create_index('uq_inventory_product_id_location_id', 'inventory', ['product_id', 'location_id'], unique=True)
+    op.create_index('ix_location_updates_shipment_id_timestamp', 'location_updates', ['shipment_id', 'timestamp'], unique=False)
+    op.create_index('ix_shipment_items_shipment_id_product_id', 'shipment_items', ['shipment_id', 'product_id'], unique=False)
+    op.create_index('ix_expenses_expense_date', 'expenses', ['expense_date'], unique=False)
+    op.create_index('ix_expenses_status_expense_date', 'expenses', ['status', 'expense_date'], unique=False)
+    op.create_index('ix_expenses_category_id_expense_date', 'expenses', ['category_id', 'expense_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_category_id_expense_date', table_name='expenses')
+    op.drop_index('ix_expenses_status_expense_date', table_name='expenses')
+    op.drop_index('ix_expenses_expense_date', table_name='expenses')
+    op.drop_index('ix_shipment_items_shipment_id_product_id', table_name='shipment_items')
+    op.drop_index('ix_location_updates_shipment_id_timestamp', table_name='location_updates')
+    op.drop_index('uq_inventory_product_id_location_id', table_name='inventory')
@@ -0,0 +1,51 @@
+"""Add expense monthly rollups
+
+Revision ID: b7e0c4d29f61
+Revises: 8d4f2a6c1e93
+Create Date: 2026-10-18 13:22:06.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e0c4d29f61'
+down_revision: Union[str, Sequence[str], None] = '8d4f2a6c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expense_monthly_rollups',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total_usd', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('year', 'month', 'category_id', 'status')
+    )
+
+    # Backfill; `python -m app.services.expense_rollup` does the same at any time
+    if op.get_bind().dialect.name == 'sqlite':
+        year = "CAST(STRFTIME('%Y', expense_date) AS INTEGER)"
+        month = "CAST(STRFTIME('%m', expense_date) AS INTEGER)"
+    else:
+        year = "CAST(EXTRACT(YEAR FROM expense_date) AS INTEGER)"
+        month = "CAST(EXTRACT(MONTH FROM expense_date) AS INTEGER)"
+    op.execute(f"""
+        INSERT INTO expense_monthly_rollups (year, month, category_id, status, total_usd, expense_count)
+        SELECT {year}, {month}, COALESCE(category_id, 0), COALESCE(status, 'draft'),
+               COALESCE(SUM(amount_usd), 0), COUNT(id)
+        FROM expenses
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_monthly_rollups')
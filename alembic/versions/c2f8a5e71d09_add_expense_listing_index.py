@@ -0,0 +1,28 @@
+"""Add expense listing index
+
+Revision ID: c2f8a5e71d09
+Revises: 4a7d3e9c0b15
+Create Date: 2026-10-18 15:31:44.275120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f8a5e71d09'
+down_revision: Union[str, Sequence[str], None] = '4a7d3e9c0b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_expenses_status_id', 'expenses', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_status_id', table_name='expenses')
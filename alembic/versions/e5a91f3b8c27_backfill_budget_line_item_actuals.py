@@ -0,0 +1,46 @@
+"""Backfill budget line item actuals
+
+Revision ID: e5a91f3b8c27
+Revises: b7e0c4d29f61
+Create Date: 2026-10-18 14:08:33.907415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a91f3b8c27'
+down_revision: Union[str, Sequence[str], None] = 'b7e0c4d29f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Approved expenses in the line's category within its budget's period;
+    # kept up to date by the expense approval workflow from here on
+    op.execute("""
+        UPDATE budget_line_items SET actual_amount = COALESCE((
+            SELECT SUM(e.amount_usd)
+            FROM expenses e JOIN budgets b ON b.id = budget_line_items.budget_id
+            WHERE e.category_id = budget_line_items.category_id
+              AND e.status = 'approved'
+              AND e.expense_date BETWEEN b.start_date AND b.end_date
+        ), 0)
+    """)
+    op.execute("""
+        UPDATE budget_line_items SET variance_percentage = CASE
+            WHEN COALESCE(budgeted_amount, 0) <= 0 THEN NULL
+            WHEN (budgeted_amount - actual_amount) * 100.0 / budgeted_amount < -999.99 THEN -999.99
+            ELSE (budgeted_amount - actual_amount) * 100.0 / budgeted_amount
+        END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data-only migration; the previous actuals were never populated
+    pass
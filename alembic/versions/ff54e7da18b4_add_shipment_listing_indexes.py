@@ -0,0 +1,34 @@
+"""Add shipment listing indexes
+
+Revision ID: ff54e7da18b4
+Revises: 2833bc4f0e83
+Create Date: 2026-10-18 09:12:40.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ff54e7da18b4'
+down_revision: Union[str, Sequence[str], None] = '2833bc4f0e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_shipments_status_id', 'shipments', ['status', 'id'], unique=False)
+    op.create_index('ix_shipments_origin_location_id_id', 'shipments', ['origin_location_id', 'id'], unique=False)
+    op.create_index('ix_shipments_destination_location_id_id', 'shipments', ['destination_location_id', 'id'], unique=False)
+    op.create_index('ix_shipments_created_at_id', 'shipments', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_shipments_created_at_id', table_name='shipments')
+    op.drop_index('ix_shipments_destination_location_id_id', table_name='shipments')
+    op.drop_index('ix_shipments_origin_location_id_id', table_name='shipments')
+    op.drop_index('ix_shipments_status_id', table_name='shipments')
@@ -3,8 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.core.auth import verify_password, get_password_hash, create_access_token
+from app.core.auth import hash_password, verify_and_update_password, create_access_token
 from app.core.deps import get_current_active_user
+from app.core.principals import Principal, principal_cache
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserLogin, Token, UserResponse
 
@@ -18,7 +19,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await hash_password(user_data.password),
         full_name=user_data.full_name,
         role=user_data.role
     )
@@ -32,18 +33,26 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    verified, new_hash = await verify_and_update_password(user_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made
+        user.hashed_password = new_hash
     user.last_login = datetime.utcnow()
     await db.commit()
+    principal_cache.invalidate(user.id)
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data={"sub": str(user.id), "ver": user.token_version})
     return Token(access_token=access_token, user=UserResponse.model_validate(user))
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_active_user)):
     return current_user
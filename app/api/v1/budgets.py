@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional
 
 from app.core.database import get_db
-from app.models.expense import Budget, BudgetLineItem, Expense, ExpenseCategory
-from app.schemas.expense import BudgetCreate, Budget as BudgetSchema
+from app.models.expense import Budget
+from app.schemas.expense import BudgetCreate, Budget as BudgetSchema, BudgetVariance
+from app.services.budget_service import BudgetService
 
 router = APIRouter()
 
@@ -23,30 +24,22 @@ async def get_budgets(db: AsyncSession = Depends(get_db)):
     budgets = result.scalars().all()
     return budgets
 
-@router.get("/budgets/{budget_id}/variance")
-async def get_budget_variance(budget_id: int, db: AsyncSession = Depends(get_db)):
-    """Get budget vs actual variance report"""
-    budget_result = await db.execute(select(Budget).where(Budget.id == budget_id))
-    budget = budget_result.scalar_one_or_none()
-    if not budget:
-        raise HTTPException(status_code=404, detail="Budget not found")
-
-    # Get actual expenses for budget period
-    actual_result = await db.execute(
-        select(func.sum(Expense.amount_usd)).where(
-            Expense.expense_date.between(budget.start_date, budget.end_date)
-        )
+@router.get("/budgets/variance", response_model=List[BudgetVariance])
+async def get_budgets_variance(
+    budget_id: Optional[List[int]] = Query(None),
+    fiscal_year: Optional[int] = None,
+    period_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Budget vs approved actuals for all or filtered budgets, per line item category"""
+    return await BudgetService.variance_report(
+        db, budget_ids=budget_id, fiscal_year=fiscal_year, period_type=period_type
     )
-    actual_expenses = actual_result.scalar() or 0
 
-    variance = float(budget.total_budget) - float(actual_expenses)
-    variance_percentage = (variance / float(budget.total_budget)) * 100 if budget.total_budget > 0 else 0
-
-    return {
-        "budget_name": budget.name,
-        "budgeted_amount": float(budget.total_budget),
-        "actual_amount": float(actual_expenses),
-        "variance": variance,
-        "variance_percentage": variance_percentage,
-        "period": f"{budget.start_date} to {budget.end_date}"
-    }
+@router.get("/budgets/{budget_id}/variance", response_model=BudgetVariance)
+async def get_budget_variance(budget_id: int, db: AsyncSession = Depends(get_db)):
+    """Budget vs approved actuals for one budget, per line item category"""
+    report = await BudgetService.variance_report(db, budget_ids=[budget_id])
+    if not report:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return report[0]
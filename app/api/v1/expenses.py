@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
-from datetime import datetime
+from sqlalchemy import select
+from typing import List, Optional
+from datetime import date, datetime
 
 from app.core.database import get_db
+from app.core.response_cache import dashboard_cache
 from app.models.expense import Expense, ExpenseCategory, Vendor
+from app.services.budget_service import BudgetService
+from app.services.expense_numbers import expense_numbers
+from app.services.expense_rollup import ExpenseRollupService
+from app.services.expense_service import ExpenseService
+from app.utils.imports import import_format, iter_records
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.schemas.expense import (
     ExpenseCreate, Expense as ExpenseSchema, ExpenseUpdate,
     ExpenseCategoryCreate, ExpenseCategory as ExpenseCategorySchema,
-    VendorCreate, Vendor as VendorSchema, ExpenseReport
+    VendorCreate, Vendor as VendorSchema, ExpenseReport, ExpensePage, ExpenseImportResult
 )
 
 router = APIRouter()
@@ -48,9 +55,7 @@ async def get_vendors(db: AsyncSession = Depends(get_db)):
 @router.post("/expenses/", response_model=ExpenseSchema)
 async def create_expense(expense: ExpenseCreate, db: AsyncSession = Depends(get_db)):
     # Generate expense number
-    count_result = await db.execute(select(func.count(Expense.id)))
-    count = count_result.scalar() or 0
-    expense_number = f"EXP-2024-{count + 1:04d}"
+    expense_number, = await expense_numbers.allocate(db)
 
     # Calculate USD amount
     amount_usd = expense.amount * expense.exchange_rate if hasattr(expense, 'exchange_rate') else expense.amount
@@ -61,15 +66,54 @@ async def create_expense(expense: ExpenseCreate, db: AsyncSession = Depends(get_
         **expense.model_dump()
     )
     db.add(db_expense)
+    await db.flush()
+    await ExpenseRollupService.record_change(db, None, db_expense)
     await db.commit()
+    dashboard_cache.bump()
     await db.refresh(db_expense)
     return db_expense
 
-@router.get("/expenses/", response_model=List[ExpenseSchema])
-async def get_expenses(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Expense))
-    expenses = result.scalars().all()
-    return expenses
+@router.post("/expenses/import", response_model=ExpenseImportResult)
+async def import_expenses(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import expenses from a CSV or NDJSON upload; bad rows are reported, not fatal"""
+    records = iter_records(file.file, import_format(file.filename, format))
+    result = await ExpenseService.import_expenses(db, records)
+    await db.commit()
+    if result["imported"]:
+        dashboard_cache.bump()
+    return result
+
+@router.get("/expenses/", response_model=ExpensePage, response_model_exclude_unset=True)
+async def get_expenses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,expense_number,amount,status"),
+    status: Optional[str] = None,
+    category_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    shipment_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List expenses newest first, one keyset page at a time"""
+    items, next_cursor = await ExpenseService.list_expenses(
+        db,
+        limit=limit,
+        cursor=cursor,
+        fields=ExpenseService.parse_fields(fields),
+        status=status,
+        category_id=category_id,
+        vendor_id=vendor_id,
+        shipment_id=shipment_id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return ExpensePage(items=items, next_cursor=next_cursor)
 
 @router.get("/expenses/{expense_id}", response_model=ExpenseSchema)
 async def get_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
@@ -86,11 +130,18 @@ async def update_expense(expense_id: int, expense_update: ExpenseUpdate, db: Asy
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
+    before = ExpenseRollupService.entry(expense)
+    before_actual = BudgetService.actual_entry(expense)
     update_data = expense_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(expense, field, value)
+    if "amount" in update_data:
+        expense.amount_usd = expense.amount * (expense.exchange_rate or 1)
 
+    await ExpenseRollupService.record_change(db, before, expense)
+    await BudgetService.record_change(db, before_actual, expense)
     await db.commit()
+    dashboard_cache.bump()
     await db.refresh(expense)
     return expense
 
@@ -105,10 +156,13 @@ async def submit_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
     if expense.status != "draft":
         raise HTTPException(status_code=400, detail="Only draft expenses can be submitted")
 
+    before = ExpenseRollupService.entry(expense)
     expense.status = "submitted"
     expense.submitted_at = datetime.now()
 
+    await ExpenseRollupService.record_change(db, before, expense)
     await db.commit()
+    dashboard_cache.bump()
     return {"message": "Expense submitted for approval"}
 
 @router.post("/expenses/{expense_id}/approve")
@@ -121,11 +175,16 @@ async def approve_expense(expense_id: int, approval_data: dict, db: AsyncSession
     if expense.status != "submitted":
         raise HTTPException(status_code=400, detail="Only submitted expenses can be approved")
 
+    before = ExpenseRollupService.entry(expense)
+    before_actual = BudgetService.actual_entry(expense)
     expense.status = "approved"
     expense.approved_at = datetime.now()
     expense.approved_by_name = "Manager"  # Simplified for now
 
+    await ExpenseRollupService.record_change(db, before, expense)
+    await BudgetService.record_change(db, before_actual, expense)
     await db.commit()
+    dashboard_cache.bump()
     return {"message": "Expense approved"}
 
 @router.post("/expenses/{expense_id}/reject")
@@ -135,36 +194,33 @@ async def reject_expense(expense_id: int, rejection_data: dict, db: AsyncSession
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
+    before = ExpenseRollupService.entry(expense)
+    before_actual = BudgetService.actual_entry(expense)
     expense.status = "rejected"
     expense.rejection_reason = rejection_data.get("reason", "No reason provided")
 
+    await ExpenseRollupService.record_change(db, before, expense)
+    await BudgetService.record_change(db, before_actual, expense)
     await db.commit()
+    dashboard_cache.bump()
     return {"message": "Expense rejected"}
 
 # Reports
 @router.get("/reports/expenses", response_model=ExpenseReport)
-async def get_expense_report(db: AsyncSession = Depends(get_db)):
-    # Get total expenses
-    total_result = await db.execute(select(func.sum(Expense.amount_usd)))
-    total_expenses = total_result.scalar() or 0
-
-    # Get expense count
-    count_result = await db.execute(select(func.count(Expense.id)))
-    expense_count = count_result.scalar() or 0
-
-    # Calculate average
-    average_expense = total_expenses / expense_count if expense_count > 0 else 0
-
-    # Get expenses by category (simplified)
-    expenses_by_category = {"Office Supplies": float(total_expenses)}
-
-    # Get expenses by status
-    expenses_by_status = {"draft": expense_count}
-
-    return ExpenseReport(
-        total_expenses=total_expenses,
-        expense_count=expense_count,
-        average_expense=average_expense,
-        expenses_by_category=expenses_by_category,
-        expenses_by_status=expenses_by_status
+async def get_expense_report(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    vendor_id: Optional[int] = None,
+    shipment_id: Optional[int] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    report = await ExpenseService.expense_report(
+        db,
+        date_from=date_from,
+        date_to=date_to,
+        vendor_id=vendor_id,
+        shipment_id=shipment_id,
+        status=status,
     )
+    return ExpenseReport(**report)
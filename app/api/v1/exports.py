@@ -0,0 +1,98 @@
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models.expense import Expense
+from app.models.location_tracking import LocationUpdate
+from app.models.shipment import Shipment
+from app.models.shipment_item import ShipmentItem
+from app.services.expense_service import ExpenseService
+from app.services.shipment_service import ShipmentService
+from app.utils.dates import to_naive_utc
+from app.utils.export import export_response
+
+router = APIRouter()
+
+@router.get("/exports/expenses")
+async def export_expenses(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; all by default"),
+    status: Optional[str] = None,
+    category_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    shipment_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream expenses as CSV or NDJSON"""
+    return export_response(
+        db, Expense,
+        lambda query: ExpenseService.filter_expenses(
+            query, date_from=date_from, date_to=date_to, vendor_id=vendor_id,
+            shipment_id=shipment_id, status=status, category_id=category_id
+        ),
+        columns, format, "expenses"
+    )
+
+@router.get("/exports/shipments")
+async def export_shipments(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; all by default"),
+    status: Optional[str] = None,
+    origin_location_id: Optional[int] = None,
+    destination_location_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream shipments as CSV or NDJSON"""
+    return export_response(
+        db, Shipment,
+        lambda query: ShipmentService.filter_shipments(
+            query, status, origin_location_id, destination_location_id, created_from, created_to
+        ),
+        columns, format, "shipments"
+    )
+
+@router.get("/exports/shipment-items")
+async def export_shipment_items(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; all by default"),
+    shipment_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream shipment items as CSV or NDJSON"""
+    def query_filter(query):
+        if shipment_id is not None:
+            query = query.where(ShipmentItem.shipment_id == shipment_id)
+        if product_id is not None:
+            query = query.where(ShipmentItem.product_id == product_id)
+        return query
+
+    return export_response(db, ShipmentItem, query_filter, columns, format, "shipment-items")
+
+@router.get("/exports/location-updates")
+async def export_location_updates(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; all by default"),
+    shipment_id: Optional[int] = None,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream location updates as CSV or NDJSON"""
+    def query_filter(query):
+        if shipment_id is not None:
+            query = query.where(LocationUpdate.shipment_id == shipment_id)
+        if from_ is not None:
+            query = query.where(LocationUpdate.timestamp >= to_naive_utc(from_))
+        if to is not None:
+            query = query.where(LocationUpdate.timestamp <= to_naive_utc(to))
+        return query
+
+    return export_response(db, LocationUpdate, query_filter, columns, format, "location-updates")
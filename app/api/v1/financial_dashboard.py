@@ -1,28 +1,30 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract
-from datetime import datetime, date
+from sqlalchemy import select, func
+from datetime import datetime
 from decimal import Decimal
 
 from app.core.database import get_db
-from app.models.expense import Expense, ExpenseCategory
+from app.core.response_cache import dashboard_cache
+from app.models.expense import ExpenseCategory, ExpenseMonthlyRollup as Rollup
 from app.schemas.expense import FinancialKPIs
 
 router = APIRouter()
 
 @router.get("/dashboard/financial-kpis", response_model=FinancialKPIs)
-async def get_financial_kpis(db: AsyncSession = Depends(get_db)):
+async def get_financial_kpis(request: Request, db: AsyncSession = Depends(get_db)):
     """Get real-time financial KPIs for dashboard"""
+    return await dashboard_cache.respond(request, lambda: _financial_kpis(db))
+
+async def _financial_kpis(db: AsyncSession) -> FinancialKPIs:
     current_month = datetime.now().month
     current_year = datetime.now().year
 
-    # Total monthly expenses
+    # Total monthly expenses (all figures come from the monthly rollup)
     monthly_result = await db.execute(
-        select(func.sum(Expense.amount_usd)).where(
-            and_(
-                extract('month', Expense.expense_date) == current_month,
-                extract('year', Expense.expense_date) == current_year
-            )
+        select(func.sum(Rollup.total_usd)).where(
+            Rollup.year == current_year,
+            Rollup.month == current_month
         )
     )
     total_monthly_expenses = monthly_result.scalar() or Decimal('0')
@@ -32,11 +34,9 @@ async def get_financial_kpis(db: AsyncSession = Depends(get_db)):
     last_month_year = current_year if current_month > 1 else current_year - 1
 
     last_month_result = await db.execute(
-        select(func.sum(Expense.amount_usd)).where(
-            and_(
-                extract('month', Expense.expense_date) == last_month,
-                extract('year', Expense.expense_date) == last_month_year
-            )
+        select(func.sum(Rollup.total_usd)).where(
+            Rollup.year == last_month_year,
+            Rollup.month == last_month
         )
     )
     last_month_expenses = last_month_result.scalar() or Decimal('1')
@@ -47,10 +47,11 @@ async def get_financial_kpis(db: AsyncSession = Depends(get_db)):
     category_result = await db.execute(
         select(
             ExpenseCategory.name,
-            func.sum(Expense.amount_usd).label('total')
-        ).join(Expense, Expense.category_id == ExpenseCategory.id)
+            func.sum(Rollup.total_usd).label('total')
+        ).join(Rollup, Rollup.category_id == ExpenseCategory.id)
         .group_by(ExpenseCategory.name)
-        .order_by(func.sum(Expense.amount_usd).desc())
+        .having(func.sum(Rollup.expense_count) > 0)
+        .order_by(func.sum(Rollup.total_usd).desc())
         .limit(5)
     )
 
@@ -61,7 +62,7 @@ async def get_financial_kpis(db: AsyncSession = Depends(get_db)):
 
     # Pending approvals count
     pending_result = await db.execute(
-        select(func.count(Expense.id)).where(Expense.status == 'submitted')
+        select(func.sum(Rollup.expense_count)).where(Rollup.status == 'submitted')
     )
     pending_approvals = pending_result.scalar() or 0
 
@@ -74,20 +75,25 @@ async def get_financial_kpis(db: AsyncSession = Depends(get_db)):
     )
 
 @router.get("/dashboard/expense-trends")
-async def get_expense_trends(db: AsyncSession = Depends(get_db)):
+async def get_expense_trends(request: Request, db: AsyncSession = Depends(get_db)):
     """Get expense trends for charts"""
+    return await dashboard_cache.respond(request, lambda: _expense_trends(db))
+
+async def _expense_trends(db: AsyncSession) -> dict:
     # Get monthly expenses for the last 6 months
     result = await db.execute(
         select(
-            extract('month', Expense.expense_date).label('month'),
-            extract('year', Expense.expense_date).label('year'),
-            func.sum(Expense.amount_usd).label('total')
+            Rollup.month,
+            Rollup.year,
+            func.sum(Rollup.total_usd).label('total')
         ).group_by(
-            extract('month', Expense.expense_date),
-            extract('year', Expense.expense_date)
+            Rollup.month,
+            Rollup.year
+        ).having(
+            func.sum(Rollup.expense_count) > 0
         ).order_by(
-            extract('year', Expense.expense_date),
-            extract('month', Expense.expense_date)
+            Rollup.year,
+            Rollup.month
         ).limit(6)
     )
 
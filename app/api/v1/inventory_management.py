@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.models.inventory import Inventory
-from app.schemas.inventory import Inventory as InventorySchema, InventoryCreate
+from app.schemas.inventory import Inventory as InventorySchema, InventoryCreate, ReservationRequest
+from app.services.inventory_service import InventoryService
 
 router = APIRouter()
 
@@ -27,3 +28,14 @@ async def create_inventory(inventory_data: InventoryCreate, db: AsyncSession = D
     await db.commit()
     await db.refresh(db_inventory)
     return db_inventory
+
+@router.post("/reserve")
+async def reserve_inventory_lines(reservation: ReservationRequest, db: AsyncSession = Depends(get_db)):
+    """Reserve every line of an order at one location, all or nothing"""
+    reserved = await InventoryService.reserve_lines(
+        db, reservation.location_id,
+        [(line.product_id, line.quantity) for line in reservation.lines]
+    )
+    if not reserved:
+        raise HTTPException(status_code=400, detail="Insufficient inventory")
+    return {"message": "Inventory reserved", "lines": len(reservation.lines)}
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from datetime import datetime
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, Field
 
 from app.core.database import get_db
 from app.models.location_tracking import LocationUpdate
 from app.models.shipment import Shipment
 from app.core.websocket_manager import manager
+from app.utils.dates import to_naive_utc
 
 router = APIRouter()
 
@@ -18,6 +20,10 @@ class LocationUpdateRequest(BaseModel):
     speed: float = None
     heading: float = None
 
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO-8601 ping timestamp into naive UTC, matching the timestamp column"""
+    return to_naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
 @router.post("/{shipment_id}/location")
 async def update_shipment_location(
     shipment_id: int,
@@ -32,7 +38,7 @@ async def update_shipment_location(
         raise HTTPException(status_code=404, detail="Shipment not found")
 
     # Parse timestamp
-    timestamp = datetime.fromisoformat(location_data.timestamp.replace('Z', '+00:00'))
+    timestamp = parse_timestamp(location_data.timestamp)
 
     # Save location update
     location_update = LocationUpdate(
@@ -61,3 +67,64 @@ async def update_shipment_location(
 
     return {"message": "Location updated successfully"}
 
+class LocationPing(LocationUpdateRequest):
+    shipment_id: int
+
+class LocationPingBatch(BaseModel):
+    pings: List[LocationPing] = Field(..., min_length=1, max_length=5000)
+
+@router.post("/locations/batch")
+async def ingest_location_batch(batch: LocationPingBatch, db: AsyncSession = Depends(get_db)):
+    """Store many pings for many shipments at once and broadcast each shipment's latest position"""
+    shipment_ids = {ping.shipment_id for ping in batch.pings}
+    result = await db.execute(
+        select(Shipment.id, Shipment.tracking_number).where(Shipment.id.in_(shipment_ids))
+    )
+    tracking_numbers = dict(result.all())
+
+    rows = []
+    latest = {}
+    rejected = []
+    for index, ping in enumerate(batch.pings):
+        if ping.shipment_id not in tracking_numbers:
+            rejected.append({"index": index, "shipment_id": ping.shipment_id, "reason": "Shipment not found"})
+            continue
+        try:
+            timestamp = parse_timestamp(ping.timestamp)
+        except ValueError:
+            rejected.append({"index": index, "shipment_id": ping.shipment_id, "reason": "Invalid timestamp"})
+            continue
+
+        rows.append({
+            "shipment_id": ping.shipment_id,
+            "latitude": ping.latitude,
+            "longitude": ping.longitude,
+            "timestamp": timestamp,
+            "speed": ping.speed,
+            "heading": ping.heading
+        })
+        current = latest.get(ping.shipment_id)
+        if current is None or timestamp >= current[0]:
+            latest[ping.shipment_id] = (timestamp, ping)
+
+    if rows:
+        # One executemany, batched by SQLAlchemy into multi-row INSERTs
+        await db.execute(insert(LocationUpdate), rows)
+        await db.commit()
+
+    # One broadcast per subscribed shipment, carrying only its newest point
+    for shipment_id, (_, ping) in latest.items():
+        if not manager.wants(shipment_id):
+            continue
+        await manager.broadcast_to_shipment({
+            "type": "location_update",
+            "shipment_id": shipment_id,
+            "latitude": ping.latitude,
+            "longitude": ping.longitude,
+            "timestamp": ping.timestamp,
+            "speed": ping.speed,
+            "heading": ping.heading,
+            "tracking_number": tracking_numbers[shipment_id]
+        }, shipment_id)
+
+    return {"accepted": len(rows), "rejected": rejected}
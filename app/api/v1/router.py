@@ -1,12 +1,11 @@
-from fastapi import APIRouter
+import importlib
+from fastapi import APIRouter, FastAPI
 from .inventory import router as inventory_router
 from .shipments import router as shipments_router
 from .shipment_items import router as shipment_items_router
 from .inventory_management import router as inventory_mgmt_router
 from .location_tracking import router as location_router
 from .expenses import router as expenses_router
-from .financial_dashboard import router as dashboard_router
-from .budgets import router as budgets_router
 from .auth import router as auth_router
 
 api_router = APIRouter()
@@ -17,5 +16,43 @@ api_router.include_router(shipment_items_router, prefix="/shipments", tags=["shi
 api_router.include_router(inventory_mgmt_router, prefix="/inventory", tags=["inventory-management"])
 api_router.include_router(location_router, prefix="/shipments", tags=["location-tracking"])
 api_router.include_router(expenses_router, prefix="", tags=["expenses"])
-api_router.include_router(dashboard_router, prefix="", tags=["financial-dashboard"])
-api_router.include_router(budgets_router, prefix="", tags=["budgets"])
+
+# Rarely hit routers: (path prefix they serve, module, tag). Their modules are
+# imported on the first matching request instead of at cold start.
+LAZY_ROUTERS = [
+    ("/dashboard", "app.api.v1.financial_dashboard", "financial-dashboard"),
+    ("/budgets", "app.api.v1.budgets", "budgets"),
+    ("/exports", "app.api.v1.exports", "exports"),
+]
+
+def include_lazy_routers(app: FastAPI, prefix: str, lazy: bool = True):
+    """Register LAZY_ROUTERS on the app, deferring their imports when lazy is set"""
+    loaded = set()
+
+    def load(module_name: str, tag: str):
+        if module_name in loaded:
+            return
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=[tag])
+        loaded.add(module_name)
+        app.openapi_schema = None
+
+    if not lazy:
+        for _, module_name, tag in LAZY_ROUTERS:
+            load(module_name, tag)
+        return
+
+    class LazyRouterMiddleware:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            if scope["type"] == "http" and len(loaded) < len(LAZY_ROUTERS):
+                path = scope["path"]
+                load_all = path in (app.openapi_url, app.docs_url, app.redoc_url)
+                for path_prefix, module_name, tag in LAZY_ROUTERS:
+                    if load_all or path.startswith(prefix + path_prefix):
+                        load(module_name, tag)
+            await self.app(scope, receive, send)
+
+    app.add_middleware(LazyRouterMiddleware)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from typing import List
 
 from app.core.database import get_db
 from app.models.shipment_item import ShipmentItem
 from app.models.shipment import Shipment
-from app.models.inventory import Product
 from app.services.inventory_service import InventoryService
+from app.services.shipment_service import ShipmentService
 from app.schemas.shipment_item import (
     ShipmentItemCreate, ShipmentItem as ShipmentItemSchema,
     ShipmentItemUpdate, BulkItemsCreate, BulkItemsResponse,
@@ -40,6 +40,8 @@ async def add_item_to_shipment(shipment_id: int, item: ShipmentItemCreate, db: A
 
     db_item = ShipmentItem(shipment_id=shipment_id, **item.model_dump())
     db.add(db_item)
+    await db.flush()
+    await ShipmentService.refresh_totals(db, shipment_id)
     await db.commit()
     await db.refresh(db_item)
     return db_item
@@ -60,6 +62,8 @@ async def update_shipment_item(shipment_id: int, item_id: int, item_update: Ship
     for field, value in update_data.items():
         setattr(item, field, value)
 
+    await db.flush()
+    await ShipmentService.refresh_totals(db, shipment_id)
     await db.commit()
     await db.refresh(item)
     return item
@@ -77,75 +81,80 @@ async def remove_item_from_shipment(shipment_id: int, item_id: int, db: AsyncSes
         raise HTTPException(status_code=404, detail="Item not found")
 
     await db.delete(item)
+    await db.flush()
+    await ShipmentService.refresh_totals(db, shipment_id)
     await db.commit()
     return {"message": "Item removed successfully"}
 
 @router.post("/{shipment_id}/items/bulk", response_model=BulkItemsResponse)
 async def bulk_add_items(shipment_id: int, bulk_data: BulkItemsCreate, db: AsyncSession = Depends(get_db)):
+    """Add many items in one INSERT ... RETURNING, reserving their stock first, all or nothing"""
     shipment_result = await db.execute(select(Shipment).where(Shipment.id == shipment_id))
-    if not shipment_result.scalar_one_or_none():
+    shipment = shipment_result.scalar_one_or_none()
+    if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
 
-    created_items = []
-    total_value = 0.0
+    rows = [
+        {"shipment_id": shipment_id, "product_id": item.product_id, "quantity": item.quantity, "unit_price": item.unit_price}
+        for item in bulk_data.items
+    ]
 
-    for item_data in bulk_data.items:
-        db_item = ShipmentItem(shipment_id=shipment_id, **item_data.model_dump())
-        db.add(db_item)
-        created_items.append(db_item)
-        total_value += item_data.quantity * item_data.unit_price
+    # Reserve inventory if shipment is pending
+    if shipment.status == "pending":
+        await InventoryService.reserve_lines(
+            db, shipment.origin_location_id,
+            [(row["product_id"], row["quantity"]) for row in rows],
+            commit=False
+        )
 
+    table = ShipmentItem.__table__
+    result = await db.execute(
+        insert(table).returning(
+            table.c.id, table.c.shipment_id, table.c.product_id,
+            table.c.quantity, table.c.unit_price, table.c.created_at,
+            sort_by_parameter_order=True
+        ),
+        rows
+    )
+    created_items = result.all()
+    await ShipmentService.refresh_totals(db, shipment_id)
     await db.commit()
 
-    for item in created_items:
-        await db.refresh(item)
-
+    total_value = sum(row["quantity"] * row["unit_price"] for row in rows)
     return BulkItemsResponse(created_items=created_items, total_value=total_value)
 
 @router.post("/{shipment_id}/items/copy", response_model=CopyItemsResponse)
 async def copy_items_from_shipment(shipment_id: int, copy_data: CopyItemsRequest, db: AsyncSession = Depends(get_db)):
-    source_result = await db.execute(
-        select(ShipmentItem).where(ShipmentItem.shipment_id == copy_data.source_shipment_id)
-    )
-    source_items = source_result.scalars().all()
+    """Copy another shipment's items onto this one inside the database"""
+    shipment_result = await db.execute(select(Shipment).where(Shipment.id == shipment_id))
+    shipment = shipment_result.scalar_one_or_none()
+    if not shipment:
+        raise HTTPException(status_code=404, detail="Shipment not found")
 
-    if not source_items:
+    copied_count = await ShipmentService.copy_items(
+        db, copy_data.source_shipment_id, shipment, reserve=copy_data.reserve_inventory
+    )
+    if copied_count == 0:
         raise HTTPException(status_code=404, detail="Source shipment not found or has no items")
 
-    copied_count = 0
-    for source_item in source_items:
-        new_item = ShipmentItem(
-            shipment_id=shipment_id,
-            product_id=source_item.product_id,
-            quantity=source_item.quantity,
-            unit_price=source_item.unit_price
-        )
-        db.add(new_item)
-        copied_count += 1
-
     await db.commit()
     return CopyItemsResponse(copied_items=copied_count)
 
 @router.get("/{shipment_id}/summary", response_model=ShipmentSummary)
 async def get_shipment_summary(shipment_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(ShipmentItem, Product).join(Product).where(ShipmentItem.shipment_id == shipment_id)
+        select(
+            Shipment.total_value, Shipment.total_items,
+            Shipment.unique_products, Shipment.total_weight_kg
+        ).where(Shipment.id == shipment_id)
     )
-    items_with_products = result.all()
-
-    total_value = 0.0
-    total_items = 0
-    total_weight = 0.0
-    unique_products = len(items_with_products)
-
-    for item, product in items_with_products:
-        total_value += item.quantity * item.unit_price
-        total_items += item.quantity
-        total_weight += item.quantity * (product.weight_kg or 0.0)
+    totals = result.one_or_none()
+    if totals is None:
+        raise HTTPException(status_code=404, detail="Shipment not found")
 
     return ShipmentSummary(
-        total_value=total_value,
-        total_items=total_items,
-        unique_products=unique_products,
-        total_weight_kg=total_weight
+        total_value=totals.total_value,
+        total_items=totals.total_items,
+        unique_products=totals.unique_products,
+        total_weight_kg=totals.total_weight_kg
     )
@@ -1,17 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, func
+from typing import Optional
+from datetime import datetime, timezone
 
 from app.core.database import get_db
-from app.schemas.shipment import ShipmentCreate, Shipment as ShipmentSchema, ShipmentUpdate
+from app.schemas.shipment import (
+    ShipmentCreate, Shipment as ShipmentSchema, ShipmentUpdate, ShipmentPage,
+    CloneShipmentRequest, CloneShipmentResponse
+)
 from app.services.shipment_service import ShipmentService
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.sql import time_bucket
+from app.utils.dates import to_naive_utc
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ShipmentSchema])
-async def get_shipments(db: AsyncSession = Depends(get_db)):
-    return await ShipmentService.get_all_shipments(db)
+@router.get("/", response_model=ShipmentPage)
+async def get_shipments(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    origin_location_id: Optional[int] = None,
+    destination_location_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List shipments newest first, one keyset page at a time"""
+    items, next_cursor = await ShipmentService.list_shipments(
+        db, limit, cursor=cursor, status=status,
+        origin_location_id=origin_location_id,
+        destination_location_id=destination_location_id,
+        created_from=created_from, created_to=created_to
+    )
+    return ShipmentPage(items=items, next_cursor=next_cursor)
 
 @router.post("/", response_model=ShipmentSchema)
 async def create_shipment(shipment: ShipmentCreate, db: AsyncSession = Depends(get_db)):
@@ -31,6 +54,24 @@ async def update_shipment(shipment_id: int, shipment_update: ShipmentUpdate, db:
         raise HTTPException(status_code=404, detail="Shipment not found")
 
     return await ShipmentService.update_shipment(db, shipment, shipment_update)
+@router.post("/{shipment_id}/clone", response_model=CloneShipmentResponse)
+async def clone_shipment(shipment_id: int, clone_data: CloneShipmentRequest, db: AsyncSession = Depends(get_db)):
+    """Copy a shipment header and all of its items into a new pending shipment"""
+    source = await ShipmentService.get_shipment_by_id(db, shipment_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+
+    from app.models.shipment import Shipment
+    existing = await db.execute(select(Shipment.id).where(Shipment.tracking_number == clone_data.tracking_number))
+    if existing.first():
+        raise HTTPException(status_code=400, detail="Tracking number already exists")
+
+    clone, copied = await ShipmentService.clone_shipment(
+        db, source, clone_data.tracking_number,
+        estimated_delivery=clone_data.estimated_delivery, reserve=clone_data.reserve_inventory
+    )
+    return CloneShipmentResponse(shipment=clone, copied_items=copied)
+
 @router.get("/track/{tracking_number}", response_model=ShipmentSchema)
 async def track_shipment(tracking_number: str, db: AsyncSession = Depends(get_db)):
     from app.models.shipment import Shipment
@@ -57,7 +98,62 @@ async def add_location_update(
     return location_update
 
 @router.get("/{shipment_id}/locations")
-async def get_location_history(shipment_id: int, db: AsyncSession = Depends(get_db)):
+async def get_location_history(
+    shipment_id: int,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    max_points: Optional[int] = Query(None, ge=2, le=10000),
+    resolution: Optional[float] = Query(None, gt=0, description="Bucket width in seconds"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Location history in timestamp order, optionally downsampled in the database.
+
+    With `resolution` or `max_points` the track is cut into fixed-width time
+    buckets and only the latest point of each bucket is returned.
+    """
     from app.models.location_tracking import LocationUpdate
-    result = await db.execute(select(LocationUpdate).where(LocationUpdate.shipment_id == shipment_id))
-    return result.scalars().all()
+
+    from_ = to_naive_utc(from_) if from_ is not None else None
+    to = to_naive_utc(to) if to is not None else None
+
+    conditions = [LocationUpdate.shipment_id == shipment_id]
+    if from_ is not None:
+        conditions.append(LocationUpdate.timestamp >= from_)
+    if to is not None:
+        conditions.append(LocationUpdate.timestamp <= to)
+
+    query = select(LocationUpdate).where(*conditions)
+
+    if max_points is not None or resolution is not None:
+        start, end = from_, to
+        if start is None or (resolution is None and end is None):
+            bounds = await db.execute(
+                select(func.min(LocationUpdate.timestamp), func.max(LocationUpdate.timestamp)).where(*conditions)
+            )
+            first, last = bounds.one()
+            if first is None:
+                return []
+            start = start or first
+            end = end or last
+
+        origin = start.replace(tzinfo=timezone.utc).timestamp()
+        width = resolution or max((end - start).total_seconds() / max_points, 0.001)
+
+        bucket = time_bucket(LocationUpdate.timestamp, origin, width)
+        ranked = select(
+            LocationUpdate.id,
+            func.row_number().over(
+                partition_by=bucket,
+                order_by=(LocationUpdate.timestamp.desc(), LocationUpdate.id.desc())
+            ).label("rank")
+        ).where(*conditions).subquery()
+        query = select(LocationUpdate).where(
+            LocationUpdate.id.in_(select(ranked.c.id).where(ranked.c.rank == 1))
+        )
+
+    result = await db.execute(query.order_by(LocationUpdate.timestamp, LocationUpdate.id))
+    points = result.scalars().all()
+    if max_points is not None and len(points) > max_points:
+        # The closing bucket can hold the very last point; keep it over the first
+        points = points[-max_points:]
+    return points
@@ -1,11 +1,34 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost than BCRYPT_ROUNDS are flagged for a rehash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt is CPU-bound and releases the GIL, so it runs on its own small pool;
+# the semaphore keeps a login storm waiting on the event loop rather than
+# piling work onto the executor queue
+_hash_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+def _hash_semaphore() -> asyncio.Semaphore:
+    global _hash_slots
+    loop = asyncio.get_running_loop()
+    if _hash_slots is None or _hash_slots[0] is not loop:
+        _hash_slots = (loop, asyncio.Semaphore(settings.BCRYPT_MAX_WORKERS))
+    return _hash_slots[1]
+
+async def _run_hashing(func, *args):
+    async with _hash_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -13,6 +36,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash when the stored cost is outdated"""
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -23,9 +54,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+class VerifiedTokenCache:
+    """LRU of verified JWT claims keyed by a SHA-256 digest of the token.
+
+    Entries are dropped once the token's exp passes, so a cached token never
+    outlives its signature check. Tokens without exp are not cached.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.digest(token)
+        claims = self.entries.get(key)
+        if claims is None or claims["exp"] <= time.time():
+            if claims is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: dict):
+        if self.max_entries <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        key = self.digest(token)
+        self.entries[key] = claims
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def revoke(self, token: str):
+        """Drop one token, e.g. on logout"""
+        self.entries.pop(self.digest(token), None)
+
+    def revoke_subject(self, subject: str):
+        """Drop every cached token issued to a subject"""
+        for key in [key for key, claims in self.entries.items() if claims.get("sub") == subject]:
+            del self.entries[key]
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
 def verify_token(token: str) -> dict:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        token_cache.set(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
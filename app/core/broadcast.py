@@ -0,0 +1,251 @@
+"""Broadcast backends that carry WebSocket messages between workers.
+
+ConnectionManager delivers every message to its own clients directly and
+hands it to a backend, which relays it to the other workers. Each worker only
+subscribes upstream to shipments it has local subscribers for.
+
+- InMemoryBackend: single process, nothing to relay.
+- PostgresBackend: LISTEN/NOTIFY on the application database.
+- SocketBrokerBackend: a small line-delimited JSON broker over TCP, started
+  with `python -m app.core.broadcast [host] [port]`.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Called with (shipment_id, text) for messages published by other workers
+Deliver = Callable[[int, str], None]
+
+
+class BroadcastBackend:
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def subscribe(self, shipment_id: int):
+        pass
+
+    async def unsubscribe(self, shipment_id: int):
+        pass
+
+    async def publish(self, shipment_id: int, text: str):
+        pass
+
+
+class InMemoryBackend(BroadcastBackend):
+    """Single-worker backend: local delivery already reached every subscriber"""
+
+
+class PostgresBackend(BroadcastBackend):
+    """Relay messages through Postgres LISTEN/NOTIFY, one channel per shipment"""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://")
+        self.origin = uuid.uuid4().hex
+        self.connection = None
+        self.channels: Set[int] = set()
+        # asyncpg connections run one operation at a time
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def channel(shipment_id: int) -> str:
+        return f"shiptrack_shipment_{shipment_id}"
+
+    async def start(self, deliver: Deliver):
+        import asyncpg
+
+        await super().start(deliver)
+        self.connection = await asyncpg.connect(self.dsn)
+
+    async def stop(self):
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        message = json.loads(payload)
+        if message["origin"] != self.origin:
+            self.deliver(message["shipment_id"], message["text"])
+
+    async def subscribe(self, shipment_id: int):
+        async with self.lock:
+            if shipment_id not in self.channels:
+                await self.connection.add_listener(self.channel(shipment_id), self._on_notify)
+                self.channels.add(shipment_id)
+
+    async def unsubscribe(self, shipment_id: int):
+        async with self.lock:
+            if shipment_id in self.channels:
+                self.channels.discard(shipment_id)
+                await self.connection.remove_listener(self.channel(shipment_id), self._on_notify)
+
+    async def publish(self, shipment_id: int, text: str):
+        payload = json.dumps({"origin": self.origin, "shipment_id": shipment_id, "text": text})
+        async with self.lock:
+            await self.connection.execute("SELECT pg_notify($1, $2)", self.channel(shipment_id), payload)
+
+
+class BroadcastBroker:
+    """Relays published messages to every other connection subscribed to the shipment"""
+
+    def __init__(self):
+        self.subscribers: Dict[int, Set[asyncio.StreamWriter]] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[int] = set()
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                shipment_id = message["shipment_id"]
+                if message["op"] == "subscribe":
+                    subscribed.add(shipment_id)
+                    self.subscribers.setdefault(shipment_id, set()).add(writer)
+                elif message["op"] == "unsubscribe":
+                    subscribed.discard(shipment_id)
+                    self._remove(shipment_id, writer)
+                elif message["op"] == "publish":
+                    out = (json.dumps({"shipment_id": shipment_id, "text": message["text"]}) + "\n").encode()
+                    for peer in self.subscribers.get(shipment_id, set()):
+                        if peer is not writer:
+                            peer.write(out)
+        except (ConnectionError, ValueError, KeyError) as e:
+            logger.warning(f"Broker connection dropped: {e}")
+        finally:
+            for shipment_id in subscribed:
+                self._remove(shipment_id, writer)
+            writer.close()
+
+    def _remove(self, shipment_id: int, writer: asyncio.StreamWriter):
+        peers = self.subscribers.get(shipment_id)
+        if peers is not None:
+            peers.discard(writer)
+            if not peers:
+                del self.subscribers[shipment_id]
+
+
+class SocketBrokerBackend(BroadcastBackend):
+    """Relay messages through a BroadcastBroker over TCP.
+
+    A dropped broker connection is retried with exponential backoff and the
+    current subscriptions are replayed once it is back; messages published
+    while disconnected are lost.
+    """
+
+    def __init__(self, host: str, port: int, retry_delay: float = 0.5, max_retry_delay: float = 30.0):
+        self.host = host
+        self.port = port
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.listener: Optional[asyncio.Task] = None
+        self.shipments: Set[int] = set()
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self.listener is not None:
+            self.listener.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+    async def _listen(self):
+        while True:
+            try:
+                while line := await self.reader.readline():
+                    message = json.loads(line)
+                    self.deliver(message["shipment_id"], message["text"])
+                logger.warning("Broadcast broker closed the connection")
+            except (ConnectionError, ValueError, KeyError) as e:
+                logger.warning(f"Broadcast broker connection failed: {e}")
+            self.writer.close()
+            await self._reconnect()
+
+    async def _reconnect(self):
+        """Reopen the broker connection with exponential backoff and replay subscriptions"""
+        delay = self.retry_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                for shipment_id in list(self.shipments):
+                    await self._send({"op": "subscribe", "shipment_id": shipment_id})
+            except OSError as e:
+                logger.warning(f"Broadcast broker reconnect failed, retrying in {delay}s: {e}")
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+            logger.info("Reconnected to broadcast broker")
+            return
+
+    async def _send(self, message: dict):
+        if self.writer is None or self.writer.is_closing():
+            raise ConnectionError("Broadcast broker is not connected")
+        self.writer.write((json.dumps(message) + "\n").encode())
+        await self.writer.drain()
+
+    async def subscribe(self, shipment_id: int):
+        if shipment_id in self.shipments:
+            return
+        self.shipments.add(shipment_id)
+        try:
+            await self._send({"op": "subscribe", "shipment_id": shipment_id})
+        except ConnectionError:
+            pass  # replayed on reconnect
+
+    async def unsubscribe(self, shipment_id: int):
+        if shipment_id not in self.shipments:
+            return
+        self.shipments.discard(shipment_id)
+        try:
+            await self._send({"op": "unsubscribe", "shipment_id": shipment_id})
+        except ConnectionError:
+            pass  # a new connection starts with no subscriptions
+
+    async def publish(self, shipment_id: int, text: str):
+        await self._send({"op": "publish", "shipment_id": shipment_id, "text": text})
+
+
+def create_backend(name: str, database_url: str = "", broker_address: str = "") -> BroadcastBackend:
+    """Build the backend selected by WS_BROADCAST_BACKEND"""
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "postgres":
+        return PostgresBackend(database_url)
+    if name == "socket":
+        host, _, port = broker_address.rpartition(":")
+        return SocketBrokerBackend(host, int(port))
+    raise ValueError(f"Unknown WS_BROADCAST_BACKEND: {name}")
+
+
+async def _serve(host: str, port: int):
+    broker = BroadcastBroker()
+    address = await broker.start(host, port)
+    logger.info(f"Broadcast broker listening on {address[0]}:{address[1]}")
+    await broker.server.serve_forever()
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    asyncio.run(_serve(args[0] if args else "127.0.0.1", int(args[1]) if len(args) > 1 else 8765))
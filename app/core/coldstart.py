@@ -0,0 +1,103 @@
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedLoader:
+    """Wraps a module loader and records how long exec_module takes"""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        self._profiler._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            inclusive = time.perf_counter() - start
+            children = self._profiler._stack.pop()
+            if self._profiler._stack:
+                self._profiler._stack[-1] += inclusive
+            self._profiler.timings[name] = (inclusive, inclusive - children)
+            # Hand the real loader back so nothing downstream sees the wrapper
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """Meta path hook that times every module imported while it is installed.
+
+    Timings are (inclusive, self) seconds per module; inclusive covers the
+    imports a module triggers, self excludes them.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, tuple] = {}
+        self._stack: List[float] = []
+
+    @classmethod
+    def install(cls) -> "ImportProfiler":
+        profiler = cls()
+        sys.meta_path.insert(0, profiler)
+        return profiler
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def top(self, limit: int = 20) -> List[dict]:
+        """Modules with the highest self time, slowest first"""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {"module": name, "self_ms": round(own * 1000, 2), "inclusive_ms": round(total * 1000, 2)}
+            for name, (total, own) in ranked[:limit]
+        ]
+
+
+def report_cold_start(started: float, function_name: str, profiler: Optional[ImportProfiler] = None) -> float:
+    """Log cold-start duration as a CloudWatch embedded metric and return it in ms"""
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    # Embedded Metric Format: CloudWatch turns this log line into the ColdStartMs metric
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": "ShipTrack",
+                "Dimensions": [["FunctionName"]],
+                "Metrics": [{"Name": "ColdStartMs", "Unit": "Milliseconds"}],
+            }],
+        },
+        "FunctionName": function_name,
+        "ColdStartMs": duration_ms,
+    }))
+
+    if profiler is not None:
+        profiler.uninstall()
+        logger.info(f"Import profile ({len(profiler.timings)} modules): {json.dumps(profiler.top())}")
+
+    return duration_ms
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,6 +12,51 @@ class Config(BaseSettings):
     DATABASE_URL: str = Field(..., json_schema_extra={"env": "DATABASE_URL"})
     CORS_ORIGINS: str = Field(default="http://localhost:3000", json_schema_extra={"env": "CORS_ORIGINS"})
 
+    # Connection pooling. DB_POOL_PROFILE is "server" (long-running uvicorn workers),
+    # "serverless" (one persistent connection per Lambda container) or "pooler"
+    # (NullPool behind PgBouncer/RDS Proxy); unset picks serverless on Lambda
+    DB_POOL_PROFILE: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared-statement cache; set to 0 behind a transaction-mode pooler
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Connections opened during the Lambda init phase and kept for warm invocations
+    DB_PREWARM_CONNECTIONS: int = 1
+
+    # WebSocket fan-out between workers: "memory" (single worker), "postgres"
+    # (LISTEN/NOTIFY on DATABASE_URL) or "socket" (broker at WS_BROKER_ADDRESS)
+    WS_BROADCAST_BACKEND: str = "memory"
+    WS_BROKER_ADDRESS: str = "127.0.0.1:8765"
+
+    # Expense numbers are reserved from the counter row this many at a time per
+    # worker; numbers left in a block when a worker exits are skipped
+    EXPENSE_NUMBER_BLOCK_SIZE: int = 20
+
+    # In-process cache for the financial dashboard endpoints; expense writes
+    # invalidate it on the worker that handled them
+    DASHBOARD_CACHE_TTL: float = 30.0
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 256
+
+    # Resolved principals cached per worker by get_current_user
+    PRINCIPAL_CACHE_TTL: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing: bcrypt cost (hashes with another cost are upgraded on
+    # login) and how many hashes may run at once, each on its own thread
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_MAX_WORKERS: int = 2
+
+    # Verified JWT claims kept per worker until the token expires; 0 disables
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Cold-start tuning
+    LAZY_ROUTERS: bool = True  # import rarely hit routers on their first request
+    BCRYPT_SELFTEST_AT_INIT: bool = False  # otherwise passlib loads bcrypt on first hash
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 config: Config = Config()
@@ -1,7 +1,12 @@
 import os
+import time
+import asyncio
+from typing import Optional
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from .config import settings
 
 # Base class for models
@@ -11,6 +16,95 @@ Base = declarative_base()
 engine = None
 AsyncSessionLocal = None
 
+class PoolMetrics:
+    """Checkout wait times and saturation of the application connection pool"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.capacity: Optional[int] = None
+
+    def record_checkout(self, wait: float, checked_out: int, capacity: Optional[int]):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.checked_out = checked_out
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+        self.capacity = capacity
+
+    def record_checkin(self, checked_out: int):
+        self.checked_out = checked_out
+
+    def snapshot(self) -> dict:
+        def saturation(count):
+            return round(count / self.capacity, 3) if self.capacity else None
+
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "capacity": self.capacity,
+            "saturation": saturation(self.checked_out),
+            "peak_saturation": saturation(self.peak_checked_out),
+        }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        capacity = None if self._max_overflow < 0 else self.size() + self._max_overflow
+        pool_metrics.record_checkout(time.perf_counter() - start, self.checkedout(), capacity)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        pool_metrics.record_checkin(self.checkedout())
+
+def resolve_pool_profile() -> str:
+    if settings.DB_POOL_PROFILE:
+        return settings.DB_POOL_PROFILE
+    return "serverless" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "server"
+
+def pool_options(profile: str) -> dict:
+    """create_async_engine keyword arguments for a named pooling profile"""
+    if profile == "pooler":
+        # PgBouncer / RDS Proxy owns the pooling; connect per checkout
+        return {"poolclass": NullPool}
+    if profile == "serverless":
+        # Lambda serves one request at a time, so one kept-alive connection suffices
+        pool_size, max_overflow = 1, 0
+    elif profile == "server":
+        pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    else:
+        raise ValueError(f"Unknown DB_POOL_PROFILE: {profile}")
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 async def init_database():
     """Initialize database connection"""
     global engine, AsyncSessionLocal
@@ -32,7 +126,15 @@ async def init_database():
                 poolclass=StaticPool,
             )
         else:
-            engine = create_async_engine(DATABASE_URL)
+            engine = create_async_engine(
+                DATABASE_URL,
+                connect_args={
+                    # asyncpg's own cache and SQLAlchemy's adapter cache
+                    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                    "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                },
+                **pool_options(resolve_pool_profile()),
+            )
 
         AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -48,6 +150,17 @@ async def init_database():
                 await conn.run_sync(Base.metadata.drop_all)  # Clean slate
                 await conn.run_sync(Base.metadata.create_all)
 
+async def warm_pool(connections: int = 1):
+    """Open a few pooled connections up front so the first requests skip connect"""
+    if engine is None:
+        await init_database()
+
+    async def _checkout():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_checkout() for _ in range(connections)))
+
 # Dependency to get database session
 async def get_db():
     # Initialize database if not already done
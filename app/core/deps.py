@@ -1,18 +1,32 @@
-from fastapi import Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.core.auth import verify_token
+from app.core.principals import Principal, principal_cache
 from app.models.user import User
 from app.schemas.auth import UserResponse
 
 security = HTTPBearer()
 
+async def _load_principal(request: Request, user_id: int) -> Principal:
+    # Only a cache miss opens a session; honour test overrides of get_db
+    session_factory = request.app.dependency_overrides.get(get_db, get_db)
+    async with asynccontextmanager(session_factory)() as db:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return Principal.from_user(user)
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
     payload = verify_token(credentials.credentials)
     user_id = payload.get("sub")
     if user_id is None:
@@ -20,17 +34,20 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
-    
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
+    user_id, token_version = int(user_id), payload.get("ver", 0)
+
+    principal = principal_cache.get(user_id, token_version)
+    if principal is None:
+        principal = await _load_principal(request, user_id)
+        if principal.token_version != token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        principal_cache.set(principal)
+    return principal
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+
+class Principal:
+    """Read-only snapshot of the authenticated user, safe to share between requests"""
+    __slots__ = ("id", "email", "full_name", "role", "is_active", "last_login", "created_at", "token_version")
+
+    def __init__(self, id: int, email: str, full_name: str, role: UserRole, is_active: bool,
+                 last_login: Optional[datetime], created_at: datetime, token_version: int):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.is_active = is_active
+        self.last_login = last_login
+        self.created_at = created_at
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.email, user.full_name, user.role, user.is_active,
+                   user.last_login, user.created_at, user.token_version or 0)
+
+
+class PrincipalCache:
+    """Bounded LRU of resolved principals with a TTL, one entry per user.
+
+    An entry only answers for the token version it was loaded with, so tokens
+    issued before a version bump miss and are checked against the database.
+    invalidate() only reaches this worker; other workers catch up within the TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get(self, user_id: int, token_version: int) -> Optional[Principal]:
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        principal, expires = entry
+        if principal.token_version != token_version or expires <= time.monotonic():
+            return None
+        self.entries.move_to_end(user_id)
+        return principal
+
+    def set(self, principal: Principal):
+        self.entries[principal.id] = (principal, time.monotonic() + self.ttl)
+        self.entries.move_to_end(principal.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self.entries.pop(user_id, None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .config import settings
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "expires", "version")
+
+    def __init__(self, body: bytes, expires: float, version: int):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.expires = expires
+        self.version = version
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, as RFC 9110 asks for GET"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Bounded in-process LRU of serialized JSON responses with a TTL.
+
+    Writes that change the underlying data call bump(); entries built under an
+    older version are treated as misses. The cache is per worker, so other
+    workers only see a write once their own entries expire.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bump(self):
+        """Invalidate every cached entry"""
+        self.version += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.version += 1
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None or entry.version != self.version or entry.expires <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, body: bytes, version: int) -> CachedResponse:
+        """Store a body computed while `version` was current"""
+        entry = CachedResponse(body, time.monotonic() + self.ttl, version)
+        # A write that landed while the body was computed makes it stale already
+        if version == self.version:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    async def respond(self, request: Request, build: Callable[[], Awaitable]) -> Response:
+        """Serve the request from the cache, or build, serialize and cache it.
+
+        Honours If-None-Match with a 304 so polling clients skip the body too.
+        """
+        key = request.url.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        entry = self.get(key)
+        if entry is None:
+            version = self.version
+            body = json.dumps(jsonable_encoder(await build()), separators=(",", ":")).encode()
+            entry = self.set(key, body, version)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match", ""), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+
+dashboard_cache = ResponseCache(settings.DASHBOARD_CACHE_MAX_ENTRIES, settings.DASHBOARD_CACHE_TTL)
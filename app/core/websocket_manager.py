@@ -1,20 +1,68 @@
 import json
 import asyncio
+import logging
 from typing import Dict, Set
 from fastapi import WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.broadcast import BroadcastBackend, InMemoryBackend
+
+logger = logging.getLogger(__name__)
 
 class ConnectionManager:
+    # Messages buffered per client before it is treated as a slow consumer
+    max_queue_size = 256
+
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.shipment_subscriptions: Dict[int, Set[str]] = {}
         self.client_subscriptions: Dict[str, Set[int]] = {}
+        self.outboxes: Dict[str, asyncio.Queue] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
+        self.backend: BroadcastBackend = InMemoryBackend()
+        # Serialises upstream subscribe / unsubscribe so they apply in order
+        self.upstream_lock = asyncio.Lock()
+
+    async def start_backend(self, backend: BroadcastBackend):
+        """Switch to a cross-worker backend and subscribe to shipments already watched here"""
+        await self.backend.stop()
+        self.backend = backend
+        await backend.start(self._deliver)
+        for shipment_id in self.shipment_subscriptions:
+            await backend.subscribe(shipment_id)
+
+    async def stop_backend(self):
+        await self.backend.stop()
+        self.backend = InMemoryBackend()
+
+    def wants(self, shipment_id: int) -> bool:
+        """Whether a broadcast for this shipment can reach anyone"""
+        return shipment_id in self.shipment_subscriptions or not isinstance(self.backend, InMemoryBackend)
+
+    async def _sync_upstream(self, shipment_id: int):
+        """Subscribe upstream if the shipment has local subscribers, otherwise unsubscribe.
+
+        The decision is taken under the lock from the current state, so a late
+        release cannot undo a subscription made after it was scheduled.
+        """
+        async with self.upstream_lock:
+            if shipment_id in self.shipment_subscriptions:
+                await self.backend.subscribe(shipment_id)
+            else:
+                await self.backend.unsubscribe(shipment_id)
+
+    def _release_shipment(self, shipment_id: int):
+        """Forget a shipment with no local subscribers left and drop the upstream subscription"""
+        del self.shipment_subscriptions[shipment_id]
+        if not isinstance(self.backend, InMemoryBackend):
+            asyncio.create_task(self._sync_upstream(shipment_id))
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
         self.active_connections[client_id] = websocket
         self.client_subscriptions[client_id] = set()
+        self.outboxes[client_id] = asyncio.Queue(maxsize=self.max_queue_size)
+        self.writers[client_id] = asyncio.create_task(self._writer(client_id, websocket, self.outboxes[client_id]))
 
         await self.send_personal_message({
             "type": "welcome",
@@ -28,25 +76,68 @@ class ConnectionManager:
                 if shipment_id in self.shipment_subscriptions:
                     self.shipment_subscriptions[shipment_id].discard(client_id)
                     if not self.shipment_subscriptions[shipment_id]:
-                        del self.shipment_subscriptions[shipment_id]
+                        self._release_shipment(shipment_id)
 
             del self.active_connections[client_id]
             if client_id in self.client_subscriptions:
                 del self.client_subscriptions[client_id]
 
+        self.outboxes.pop(client_id, None)
+        writer = self.writers.pop(client_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one client's outbound queue so a slow socket only delays itself"""
+        try:
+            while True:
+                text = await queue.get()
+                await websocket.send_text(text)
+        except Exception:
+            self.disconnect(client_id)
+
+    def _enqueue(self, client_id: str, text: str):
+        queue = self.outboxes.get(client_id)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self._evict(client_id)
+
+    def _evict(self, client_id: str):
+        """Drop a client whose outbound queue overflowed"""
+        websocket = self.active_connections.get(client_id)
+        self.disconnect(client_id)
+        if websocket is not None:
+            asyncio.create_task(self._close_quietly(websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            # 1013: try again later
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
     async def send_personal_message(self, message: dict, client_id: str):
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception:
-                self.disconnect(client_id)
+        self._enqueue(client_id, json.dumps(message))
+
+    def _deliver(self, shipment_id: int, text: str):
+        for client_id in list(self.shipment_subscriptions.get(shipment_id, ())):
+            self._enqueue(client_id, text)
 
     async def broadcast_to_shipment(self, message: dict, shipment_id: int):
-        if shipment_id in self.shipment_subscriptions:
-            clients = self.shipment_subscriptions[shipment_id].copy()
-            for client_id in clients:
-                await self.send_personal_message(message, client_id)
+        if not self.wants(shipment_id):
+            return
+        # Serialise once; every subscriber gets the same text without waiting on the others
+        text = json.dumps(message)
+        self._deliver(shipment_id, text)
+        try:
+            await self.backend.publish(shipment_id, text)
+        except Exception as e:
+            # The write that triggered the broadcast has already committed
+            logger.warning(f"Broadcast to other workers failed for shipment {shipment_id}: {e}")
 
     async def subscribe_to_shipment(self, client_id: str, shipment_id: int, db: AsyncSession):
         # Import here to avoid circular imports
@@ -64,6 +155,7 @@ class ConnectionManager:
 
         if shipment_id not in self.shipment_subscriptions:
             self.shipment_subscriptions[shipment_id] = set()
+            await self._sync_upstream(shipment_id)
 
         self.shipment_subscriptions[shipment_id].add(client_id)
         self.client_subscriptions[client_id].add(shipment_id)
@@ -82,6 +174,7 @@ class ConnectionManager:
             self.shipment_subscriptions[shipment_id].discard(client_id)
             if not self.shipment_subscriptions[shipment_id]:
                 del self.shipment_subscriptions[shipment_id]
+                await self._sync_upstream(shipment_id)
 
         if client_id in self.client_subscriptions:
             self.client_subscriptions[client_id].discard(shipment_id)
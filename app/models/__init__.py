@@ -3,7 +3,7 @@ from .inventory import Location, Product, Inventory
 from .shipment import Shipment
 from .shipment_item import ShipmentItem
 from .location_tracking import LocationUpdate
-from .expense import ExpenseCategory, Vendor, Expense, Budget, BudgetLineItem
+from .expense import ExpenseCategory, Vendor, Expense, ExpenseNumberCounter, ExpenseMonthlyRollup, Budget, BudgetLineItem
 from .user import User, UserRole
 
 __all__ = [
@@ -17,6 +17,8 @@ __all__ = [
     "ExpenseCategory",
     "Vendor", 
     "Expense",
+    "ExpenseNumberCounter",
+    "ExpenseMonthlyRollup",
     "Budget",
     "BudgetLineItem",
     "User",
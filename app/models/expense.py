@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.core.database import Base
 from .base import BaseModel
 
 class ExpenseCategory(BaseModel):
@@ -30,6 +31,17 @@ class Vendor(BaseModel):
 
 class Expense(BaseModel):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Dashboard, report and budget variance predicates
+        Index("ix_expenses_expense_date", "expense_date"),
+        Index("ix_expenses_status_expense_date", "status", "expense_date"),
+        Index("ix_expenses_category_id_expense_date", "category_id", "expense_date"),
+        # Report filters
+        Index("ix_expenses_vendor_id_expense_date", "vendor_id", "expense_date"),
+        Index("ix_expenses_shipment_id", "shipment_id"),
+        # Approval queues: newest first within a status
+        Index("ix_expenses_status_id", "status", "id"),
+    )
 
     expense_number = Column(String(50), unique=True)
     amount = Column(Numeric(15,2), nullable=False)
@@ -76,6 +88,24 @@ class Expense(BaseModel):
     vendor = relationship("Vendor")
     shipment = relationship("Shipment")
 
+class ExpenseNumberCounter(Base):
+    """Next unallocated expense number per prefix (e.g. EXP-2026)"""
+    __tablename__ = "expense_number_counters"
+
+    prefix = Column(String(20), primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
+
+class ExpenseMonthlyRollup(Base):
+    """Expense totals per (year, month, category, status), maintained with every expense write"""
+    __tablename__ = "expense_monthly_rollups"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, primary_key=True)  # 0 for uncategorized expenses
+    status = Column(String(20), primary_key=True)
+    total_usd = Column(Numeric(15,2), nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+
 class Budget(BaseModel):
     __tablename__ = "budgets"
 
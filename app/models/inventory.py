@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -24,6 +24,10 @@ class Product(BaseModel):
 
 class Inventory(BaseModel):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # One stock row per product and location; every InventoryService lookup hits this
+        Index("uq_inventory_product_id_location_id", "product_id", "location_id", unique=True),
+    )
 
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
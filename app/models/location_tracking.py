@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import BaseModel
 
 class LocationUpdate(BaseModel):
     __tablename__ = "location_updates"
+    __table_args__ = (
+        # History and downsampling read one shipment's track in time order
+        Index("ix_location_updates_shipment_id_timestamp", "shipment_id", "timestamp"),
+    )
 
     shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
     latitude = Column(Float, nullable=False)
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class Shipment(BaseModel):
     __tablename__ = "shipments"
+    __table_args__ = (
+        # Listing filters seek on the filter column and page on id
+        Index("ix_shipments_status_id", "status", "id"),
+        Index("ix_shipments_origin_location_id_id", "origin_location_id", "id"),
+        Index("ix_shipments_destination_location_id_id", "destination_location_id", "id"),
+        Index("ix_shipments_created_at_id", "created_at", "id"),
+    )
 
     tracking_number = Column(String(50), unique=True, nullable=False)
     origin_location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
@@ -11,6 +18,12 @@ class Shipment(BaseModel):
     status = Column(String(50), default="pending")
     estimated_delivery = Column(DateTime, nullable=True)
 
+    # Item totals, kept current by ShipmentService.refresh_totals on every item write
+    total_value = Column(Float, nullable=False, default=0.0, server_default="0")
+    total_items = Column(Integer, nullable=False, default=0, server_default="0")
+    unique_products = Column(Integer, nullable=False, default=0, server_default="0")
+    total_weight_kg = Column(Float, nullable=False, default=0.0, server_default="0")
+
     # Relationships
     origin_location = relationship("Location", foreign_keys=[origin_location_id])
     destination_location = relationship("Location", foreign_keys=[destination_location_id])
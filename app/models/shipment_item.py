@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class ShipmentItem(BaseModel):
     __tablename__ = "shipment_items"
+    __table_args__ = (
+        Index("ix_shipment_items_shipment_id_product_id", "shipment_id", "product_id"),
+    )
 
     shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Integer
 from sqlalchemy.sql import func
 import enum
 from .base import BaseModel
@@ -17,3 +17,5 @@ class User(BaseModel):
     role = Column(Enum(UserRole), default=UserRole.EMPLOYEE)
     is_active = Column(Boolean, default=True)
     last_login = Column(DateTime(timezone=True))
+    # Bumped to revoke every token issued so far (deactivation, password change)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field, create_model, field_validator
 from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
@@ -53,7 +53,24 @@ class ExpenseBase(BaseModel):
     is_reimbursable: bool = False
 
 class ExpenseCreate(ExpenseBase):
-    pass
+    # Column limits, so oversized values fail validation instead of the INSERT
+    amount: Decimal = Field(max_digits=15, decimal_places=2)
+    currency: str = Field('USD', max_length=3)
+    vendor_name: Optional[str] = Field(None, max_length=200)
+    invoice_number: Optional[str] = Field(None, max_length=100)
+
+    @field_validator("currency", "vendor_name", "invoice_number", "description", "notes")
+    @classmethod
+    def storable_text(cls, value: Optional[str]) -> Optional[str]:
+        # Postgres text rejects NUL and cannot encode lone surrogates
+        if value is not None:
+            if "\x00" in value:
+                raise ValueError("must not contain NUL characters")
+            try:
+                value.encode("utf-8")
+            except UnicodeEncodeError:
+                raise ValueError("must be valid UTF-8 text")
+        return value
 
 class ExpenseUpdate(BaseModel):
     amount: Optional[Decimal] = None
@@ -76,6 +93,26 @@ class Expense(ExpenseBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Listing rows carry only the fields requested with ?fields=; the endpoint
+# serialises with exclude_unset so unrequested fields are left out entirely
+ExpenseListItem = create_model(
+    "ExpenseListItem",
+    **{name: (Optional[field.annotation], None) for name, field in Expense.model_fields.items()}
+)
+
+class ExpensePage(BaseModel):
+    items: List[ExpenseListItem]
+    next_cursor: Optional[str] = None
+
+class ExpenseImportError(BaseModel):
+    row: int
+    errors: List[dict]
+
+class ExpenseImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ExpenseImportError]
+
 class BudgetBase(BaseModel):
     name: str
     fiscal_year: int
@@ -94,6 +131,26 @@ class Budget(BudgetBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BudgetLineVariance(BaseModel):
+    line_item_id: int
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    budgeted_amount: float
+    actual_amount: float
+    variance: float
+    variance_percentage: Optional[float] = None
+
+class BudgetVariance(BaseModel):
+    budget_id: int
+    budget_name: Optional[str] = None
+    period: str
+    budgeted_amount: float
+    actual_amount: float
+    variance: float
+    variance_percentage: Optional[float] = None
+    unbudgeted_actual_amount: float  # approved spend in categories without a line item
+    lines: List[BudgetLineVariance]
+
 # Financial Reports
 class ExpenseReport(BaseModel):
     total_expenses: Decimal
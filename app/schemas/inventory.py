@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict, computed_field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from typing import List, Optional
 from datetime import datetime
 
 class LocationBase(BaseModel):
@@ -61,4 +61,12 @@ class Inventory(InventoryBase):
     def available_quantity(self) -> int:
         return self.quantity - (self.reserved_quantity or 0)
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ReservationLine(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class ReservationRequest(BaseModel):
+    location_id: int
+    lines: List[ReservationLine] = Field(..., min_length=1)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ShipmentBase(BaseModel):
@@ -19,5 +19,23 @@ class ShipmentUpdate(BaseModel):
 class Shipment(ShipmentBase):
     id: int
     created_at: datetime
+    total_value: float = 0.0
+    total_items: int = 0
+    unique_products: int = 0
+    total_weight_kg: float = 0.0
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ShipmentPage(BaseModel):
+    items: List[Shipment]
+    next_cursor: Optional[str] = None
+
+
+class CloneShipmentRequest(BaseModel):
+    tracking_number: str
+    estimated_delivery: Optional[datetime] = None
+    reserve_inventory: bool = False
+
+class CloneShipmentResponse(BaseModel):
+    shipment: Shipment
+    copied_items: int
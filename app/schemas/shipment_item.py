@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import Optional
 from datetime import datetime
 
@@ -27,7 +27,7 @@ class ShipmentItem(ShipmentItemBase):
     model_config = ConfigDict(from_attributes=True)
 
 class BulkItemsCreate(BaseModel):
-    items: list[ShipmentItemCreate]
+    items: list[ShipmentItemCreate] = Field(..., min_length=1, max_length=10000)
 
 class BulkItemsResponse(BaseModel):
     created_items: list[ShipmentItem]
@@ -35,6 +35,7 @@ class BulkItemsResponse(BaseModel):
 
 class CopyItemsRequest(BaseModel):
     source_shipment_id: int
+    reserve_inventory: bool = False
 
 class CopyItemsResponse(BaseModel):
     copied_items: int
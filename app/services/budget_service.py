@@ -0,0 +1,146 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, update, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Budget, BudgetLineItem, Expense, ExpenseCategory
+
+# (expense_date, category_id, amount_usd) of an expense that counts towards budget actuals
+ActualEntry = Tuple[date, Optional[int], Decimal]
+
+# variance_percentage is Numeric(5,2)
+MIN_VARIANCE_PERCENTAGE = Decimal("-999.99")
+
+def _variance(budgeted, actual) -> Tuple[float, Optional[float]]:
+    budgeted, actual = float(budgeted or 0), float(actual or 0)
+    variance = budgeted - actual
+    return variance, (variance / budgeted * 100 if budgeted > 0 else None)
+
+class BudgetService:
+    @staticmethod
+    def actual_entry(expense: Expense) -> Optional[ActualEntry]:
+        """What an expense adds to budget actuals; only approved expenses count"""
+        if expense.status != "approved":
+            return None
+        return expense.expense_date, expense.category_id, Decimal(expense.amount_usd or 0)
+
+    @staticmethod
+    async def apply_actual(db: AsyncSession, entry: ActualEntry, sign: int):
+        """Add or remove an approved expense on the line items of every budget covering it"""
+        expense_date, category_id, amount = entry
+        actual = func.coalesce(BudgetLineItem.actual_amount, 0) + amount * sign
+        percentage = (BudgetLineItem.budgeted_amount - actual) * 100.0 / BudgetLineItem.budgeted_amount
+        covering = select(Budget.id).where(Budget.start_date <= expense_date, Budget.end_date >= expense_date)
+        await db.execute(
+            update(BudgetLineItem)
+            .where(BudgetLineItem.category_id == category_id, BudgetLineItem.budget_id.in_(covering))
+            # Both assignments see the old row, so the percentage uses the new actual explicitly
+            .values(
+                actual_amount=actual,
+                variance_percentage=case(
+                    (func.coalesce(BudgetLineItem.budgeted_amount, 0) <= 0, None),
+                    (percentage < MIN_VARIANCE_PERCENTAGE, MIN_VARIANCE_PERCENTAGE),
+                    else_=percentage,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def record_change(db: AsyncSession, before: Optional[ActualEntry], expense: Expense):
+        """Keep BudgetLineItem actuals in step with an expense's approval, amount or category"""
+        after = BudgetService.actual_entry(expense)
+        if before == after:
+            return
+        if before is not None:
+            await BudgetService.apply_actual(db, before, -1)
+        if after is not None:
+            await BudgetService.apply_actual(db, after, 1)
+
+    @staticmethod
+    async def variance_report(
+        db: AsyncSession,
+        budget_ids: Optional[List[int]] = None,
+        fiscal_year: Optional[int] = None,
+        period_type: Optional[str] = None,
+    ) -> List[dict]:
+        """Budget vs approved actuals for many budgets, broken down by line item category.
+
+        Actuals for every selected budget come from one range join of budgets
+        against expenses grouped by (budget, category); budgets and their line
+        items are read alongside it.
+        """
+        budgets_query = select(Budget).order_by(Budget.id)
+        if budget_ids:
+            budgets_query = budgets_query.where(Budget.id.in_(budget_ids))
+        if fiscal_year is not None:
+            budgets_query = budgets_query.where(Budget.fiscal_year == fiscal_year)
+        if period_type is not None:
+            budgets_query = budgets_query.where(Budget.period_type == period_type)
+        budgets = (await db.execute(budgets_query)).scalars().all()
+        if not budgets:
+            return []
+        selected = [budget.id for budget in budgets]
+
+        line_result = await db.execute(
+            select(BudgetLineItem, ExpenseCategory.name)
+            .outerjoin(ExpenseCategory, ExpenseCategory.id == BudgetLineItem.category_id)
+            .where(BudgetLineItem.budget_id.in_(selected))
+            .order_by(BudgetLineItem.id)
+        )
+        lines: Dict[int, list] = {}
+        for line, category_name in line_result.all():
+            lines.setdefault(line.budget_id, []).append((line, category_name))
+
+        actual_result = await db.execute(
+            select(Budget.id, Expense.category_id, func.sum(Expense.amount_usd).label("total"))
+            .join(Expense, and_(
+                Expense.status == "approved",
+                Expense.expense_date >= Budget.start_date,
+                Expense.expense_date <= Budget.end_date,
+            ))
+            .where(Budget.id.in_(selected))
+            .group_by(Budget.id, Expense.category_id)
+        )
+        actuals: Dict[int, Dict[Optional[int], Decimal]] = {}
+        for budget_id, category_id, total in actual_result.all():
+            actuals.setdefault(budget_id, {})[category_id] = total or Decimal("0")
+
+        report = []
+        for budget in budgets:
+            by_category = actuals.get(budget.id, {})
+            actual_total = sum(by_category.values(), Decimal("0"))
+            variance, variance_percentage = _variance(budget.total_budget, actual_total)
+
+            line_reports = []
+            for line, category_name in lines.get(budget.id, []):
+                line_actual = by_category.get(line.category_id, Decimal("0"))
+                line_variance, line_percentage = _variance(line.budgeted_amount, line_actual)
+                line_reports.append({
+                    "line_item_id": line.id,
+                    "category_id": line.category_id,
+                    "category_name": category_name,
+                    "budgeted_amount": float(line.budgeted_amount or 0),
+                    "actual_amount": float(line_actual),
+                    "variance": line_variance,
+                    "variance_percentage": line_percentage,
+                })
+            budgeted_categories = {line.category_id for line, _ in lines.get(budget.id, [])}
+
+            report.append({
+                "budget_id": budget.id,
+                "budget_name": budget.name,
+                "period": f"{budget.start_date} to {budget.end_date}",
+                "budgeted_amount": float(budget.total_budget or 0),
+                "actual_amount": float(actual_total),
+                "variance": variance,
+                "variance_percentage": variance_percentage,
+                "unbudgeted_actual_amount": float(sum(
+                    (total for category_id, total in by_category.items() if category_id not in budgeted_categories),
+                    Decimal("0"),
+                )),
+                "lines": line_reports,
+            })
+        return report
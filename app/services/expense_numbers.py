@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.expense import ExpenseNumberCounter
+
+# prefix -> (next number, end of block exclusive)
+Blocks = Dict[str, Tuple[int, int]]
+
+
+class ExpenseNumberAllocator:
+    """Hands out expense numbers from blocks reserved on a per-prefix counter row.
+
+    A block of `block_size` numbers is reserved with one atomic UPDATE ... RETURNING
+    inside the caller's transaction, so it needs no second pooled connection.
+    Until that transaction commits the rest of the block serves only the same
+    session; on commit it is handed to the worker's other sessions, on rollback
+    it is dropped together with the counter update. The trade-offs are gaps
+    (numbers left in a block when a worker exits), numbers that are unique but
+    not ordered across workers, and a counter row lock held until the reserving
+    transaction ends.
+    """
+
+    def __init__(self, block_size: int = 20):
+        self.block_size = block_size
+        self._blocks: Blocks = {}
+        self._info_key = f"expense_numbers_{id(self)}"
+
+    def reset(self):
+        self._blocks.clear()
+
+    @staticmethod
+    def prefix_for(year: Optional[int] = None) -> str:
+        return f"EXP-{year or datetime.now().year}"
+
+    @staticmethod
+    def _take(blocks: Blocks, prefix: str, count: int) -> List[int]:
+        start, end = blocks.get(prefix, (0, 0))
+        take = min(count, end - start)
+        blocks[prefix] = (start + take, end)
+        return list(range(start, start + take))
+
+    def _session_state(self, session: Session) -> Tuple[Blocks, asyncio.Lock]:
+        """Blocks reserved by the session's open transaction, and the lock guarding refills"""
+        state = session.info.get(self._info_key)
+        if state is None:
+            state = session.info[self._info_key] = ({}, asyncio.Lock())
+            event.listen(session, "after_commit", self._publish_blocks)
+            event.listen(session, "after_transaction_end", self._drop_blocks)
+        return state
+
+    def _publish_blocks(self, session: Session):
+        blocks, _ = session.info[self._info_key]
+        for prefix, (start, end) in blocks.items():
+            current_start, current_end = self._blocks.get(prefix, (0, 0))
+            if start < end and current_start >= current_end:
+                self._blocks[prefix] = (start, end)
+        blocks.clear()
+
+    def _drop_blocks(self, session: Session, transaction):
+        # Rollback or close of the session's transaction (a commit has already
+        # published); flushes end inner transactions that must keep the blocks
+        if transaction.parent is None or transaction.nested:
+            session.info[self._info_key][0].clear()
+
+    async def allocate(self, db: AsyncSession, count: int = 1, year: Optional[int] = None) -> List[str]:
+        """Return `count` unused expense numbers such as EXP-2026-0042"""
+        prefix = self.prefix_for(year)
+        pending, refill_lock = self._session_state(db.sync_session)
+
+        # Concurrent allocations on one session wait for a single refill
+        async with refill_lock:
+            numbers = self._take(pending, prefix, count)
+            numbers += self._take(self._blocks, prefix, count - len(numbers))
+            missing = count - len(numbers)
+            if missing:
+                size = max(missing, self.block_size)
+                start = await self._reserve_block(db, prefix, size)
+                numbers += range(start, start + missing)
+                pending[prefix] = (start + missing, start + size)
+
+        return [f"{prefix}-{number:04d}" for number in numbers]
+
+    @staticmethod
+    async def _reserve_block(db: AsyncSession, prefix: str, size: int) -> int:
+        """Advance the counter by `size` in the session's transaction and return the block's first number"""
+        table = ExpenseNumberCounter.__table__
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        await db.execute(
+            dialect.insert(table)
+            .values(prefix=prefix, next_value=1)
+            .on_conflict_do_nothing(index_elements=["prefix"])
+        )
+        result = await db.execute(
+            update(table)
+            .where(table.c.prefix == prefix)
+            .values(next_value=table.c.next_value + size)
+            .returning(table.c.next_value)
+        )
+        return result.scalar_one() - size
+
+
+expense_numbers = ExpenseNumberAllocator(settings.EXPENSE_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,99 @@
+"""Monthly expense rollup read by the financial dashboards.
+
+Every expense write adjusts the (year, month, category, status) row it moves
+out of and the one it moves into, in the caller's transaction. Rebuild from
+the expenses table with `python -m app.services.expense_rollup`.
+"""
+import asyncio
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, func, delete, extract, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense, ExpenseMonthlyRollup
+
+# ((year, month, category_id, status), amount_usd)
+RollupEntry = Tuple[Tuple[int, int, int, str], Decimal]
+
+class ExpenseRollupService:
+    @staticmethod
+    def entry(expense: Expense) -> RollupEntry:
+        """The rollup row an expense counts towards and the amount it adds"""
+        key = (
+            expense.expense_date.year,
+            expense.expense_date.month,
+            expense.category_id or 0,
+            expense.status or "draft",
+        )
+        return key, Decimal(expense.amount_usd or 0)
+
+    @staticmethod
+    async def adjust(db: AsyncSession, entry: RollupEntry, sign: int, count: int = 1):
+        """Add (sign=1) or remove (sign=-1) `count` expenses totalling the entry's amount"""
+        (year, month, category_id, status), amount = entry
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        table = ExpenseMonthlyRollup.__table__
+        statement = dialect.insert(table).values(
+            year=year, month=month, category_id=category_id, status=status,
+            total_usd=amount * sign, expense_count=sign * count,
+        )
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=["year", "month", "category_id", "status"],
+            set_={
+                "total_usd": table.c.total_usd + statement.excluded.total_usd,
+                "expense_count": table.c.expense_count + statement.excluded.expense_count,
+            },
+        ))
+
+    @staticmethod
+    async def record_change(db: AsyncSession, before: Optional[RollupEntry], expense: Expense):
+        """Move an expense from its previous rollup entry to its current one"""
+        after = ExpenseRollupService.entry(expense)
+        if before == after:
+            return
+        if before is not None:
+            await ExpenseRollupService.adjust(db, before, -1)
+        await ExpenseRollupService.adjust(db, after, 1)
+
+    @staticmethod
+    async def add_many(db: AsyncSession, expenses: Iterable[Expense]):
+        """Record newly inserted expenses (or rows with the same attributes) with one upsert per rollup row"""
+        totals: Dict[tuple, list] = {}
+        for expense in expenses:
+            key, amount = ExpenseRollupService.entry(expense)
+            total = totals.setdefault(key, [Decimal("0"), 0])
+            total[0] += amount
+            total[1] += 1
+        for key, (amount, count) in totals.items():
+            await ExpenseRollupService.adjust(db, (key, amount), 1, count)
+
+    @staticmethod
+    async def rebuild(db) -> int:
+        """Recompute the whole rollup from expenses; returns the number of rows"""
+        year = extract("year", Expense.expense_date)
+        month = extract("month", Expense.expense_date)
+        category_id = func.coalesce(Expense.category_id, 0)
+        status = func.coalesce(Expense.status, "draft")
+
+        await db.execute(delete(ExpenseMonthlyRollup))
+        result = await db.execute(insert(ExpenseMonthlyRollup).from_select(
+            ["year", "month", "category_id", "status", "total_usd", "expense_count"],
+            select(
+                year, month, category_id, status,
+                func.coalesce(func.sum(Expense.amount_usd), 0), func.count(Expense.id),
+            ).group_by(year, month, category_id, status),
+        ))
+        return result.rowcount
+
+async def main():
+    from app.core import database
+
+    await database.init_database()
+    async with database.engine.begin() as conn:
+        rows = await ExpenseRollupService.rebuild(conn)
+    print(f"Rebuilt expense rollup: {rows} rows")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,244 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select, func, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense, ExpenseCategory, Vendor
+from app.models.shipment import Shipment
+from app.schemas.expense import Expense as ExpenseSchema, ExpenseCreate, ExpenseListItem
+from app.services.expense_numbers import expense_numbers
+from app.services.expense_rollup import ExpenseRollupService
+from app.utils.pagination import apply_keyset, split_page
+
+UNCATEGORIZED = "Uncategorized"
+IMPORT_CHUNK_ROWS = 1000
+# Larger ids cannot exist, and Postgres rejects them as INTEGER parameters
+MAX_ID = 2 ** 31 - 1
+
+class ExpenseService:
+    @staticmethod
+    def filter_expenses(
+        query,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        vendor_id: Optional[int] = None,
+        shipment_id: Optional[int] = None,
+        status: Optional[str] = None,
+        category_id: Optional[int] = None,
+    ):
+        """Apply the common report filters to a query over expenses"""
+        if category_id is not None:
+            query = query.where(Expense.category_id == category_id)
+        if date_from is not None:
+            query = query.where(Expense.expense_date >= date_from)
+        if date_to is not None:
+            query = query.where(Expense.expense_date <= date_to)
+        if vendor_id is not None:
+            query = query.where(Expense.vendor_id == vendor_id)
+        if shipment_id is not None:
+            query = query.where(Expense.shipment_id == shipment_id)
+        if status is not None:
+            query = query.where(Expense.status == status)
+        return query
+
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> List[str]:
+        """Validate a comma-separated ?fields= list against the expense schema"""
+        if not fields:
+            return list(ExpenseSchema.model_fields)
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in ExpenseSchema.model_fields]
+        if unknown or not requested:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return requested
+
+    @staticmethod
+    async def list_expenses(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = tuple(ExpenseSchema.model_fields),
+        **filters
+    ) -> Tuple[List[ExpenseListItem], Optional[str]]:
+        """Return one keyset page with only the requested columns selected"""
+        # id is always read because the cursor is built from it
+        columns = dict.fromkeys(["id", *fields])
+        query = ExpenseService.filter_expenses(
+            select(*(getattr(Expense, name) for name in columns)), **filters
+        )
+        result = await db.execute(apply_keyset(query, Expense.id, limit, cursor))
+        rows, next_cursor = split_page(result.all(), limit)
+        items = [ExpenseListItem(**{name: getattr(row, name) for name in fields}) for row in rows]
+        return items, next_cursor
+
+    @staticmethod
+    async def expense_report(db: AsyncSession, **filters) -> dict:
+        """Totals plus category and status breakdowns from one scan of expenses.
+
+        Postgres computes the overall, per-category and per-status groups with
+        GROUPING SETS. Elsewhere the scan groups by (category, status) and the
+        three views are folded from those few rows.
+        """
+        amount = func.coalesce(func.sum(Expense.amount_usd), 0).label("total")
+        count = func.count(Expense.id).label("count")
+        category = func.coalesce(ExpenseCategory.name, UNCATEGORIZED).label("category")
+        query = ExpenseService.filter_expenses(
+            select(Expense.category_id, category, Expense.status, amount, count)
+            .outerjoin(ExpenseCategory, ExpenseCategory.id == Expense.category_id),
+            **filters
+        )
+
+        total, expense_count = Decimal("0"), 0
+        by_category: dict = {}
+        by_status: dict = {}
+
+        if db.bind.dialect.name == "postgresql":
+            query = query.add_columns(
+                func.grouping(Expense.category_id).label("no_category"),
+                func.grouping(Expense.status).label("no_status"),
+            ).group_by(func.grouping_sets(
+                tuple_(), tuple_(Expense.category_id, ExpenseCategory.name), tuple_(Expense.status)
+            ))
+            for row in (await db.execute(query)).all():
+                if row.no_category and row.no_status:
+                    total, expense_count = Decimal(row.total), row.count
+                elif row.no_status:
+                    by_category[row.category] = by_category.get(row.category, 0.0) + float(row.total)
+                else:
+                    by_status[row.status] = row.count
+        else:
+            query = query.group_by(Expense.category_id, ExpenseCategory.name, Expense.status)
+            for row in (await db.execute(query)).all():
+                total += Decimal(row.total)
+                expense_count += row.count
+                by_category[row.category] = by_category.get(row.category, 0.0) + float(row.total)
+                by_status[row.status] = by_status.get(row.status, 0) + row.count
+
+        return {
+            "total_expenses": total,
+            "expense_count": expense_count,
+            "average_expense": total / expense_count if expense_count else Decimal("0"),
+            "expenses_by_category": by_category,
+            "expenses_by_status": by_status,
+        }
+
+    @staticmethod
+    def _resolve_names(record: dict, categories: Dict[str, int], vendors: Dict[str, int]) -> List[dict]:
+        """Swap category / vendor names for ids in place; returns lookup errors"""
+        errors = []
+        category = record.pop("category", None)
+        if category is not None and "category_id" not in record:
+            category_id = categories.get(str(category).strip().lower())
+            if category_id is None:
+                errors.append({"field": "category", "message": f"Unknown category '{category}'"})
+            else:
+                record["category_id"] = category_id
+        vendor = record.pop("vendor", None)
+        if vendor is not None:
+            record.setdefault("vendor_name", vendor)
+            if "vendor_id" not in record:
+                vendor_id = vendors.get(str(vendor).strip().lower())
+                if vendor_id is not None:
+                    record["vendor_id"] = vendor_id
+        return errors
+
+    @staticmethod
+    def _reference_errors(expense: ExpenseCreate, category_ids: Set[int], vendor_ids: Set[int],
+                          shipment_ids: Set[int]) -> List[dict]:
+        """Ids that point at no row, which the database would reject as a foreign key violation"""
+        checks = [
+            ("category_id", expense.category_id, category_ids),
+            ("subcategory_id", expense.subcategory_id, category_ids),
+            ("vendor_id", expense.vendor_id, vendor_ids),
+            ("shipment_id", expense.shipment_id, shipment_ids),
+        ]
+        return [
+            {"field": field, "message": f"Unknown {field.removesuffix('_id')} id {value}"}
+            for field, value, known in checks
+            if value is not None and value not in known
+        ]
+
+    @staticmethod
+    async def _insert_chunk(db: AsyncSession, chunk: List[Tuple[int, object]], categories: Dict[str, int],
+                            vendors: Dict[str, int], errors: List[dict]) -> int:
+        """Validate one chunk, number its valid rows as one block and insert them in one batch"""
+        chunk_errors, validated = [], []
+        for number, record in chunk:
+            if isinstance(record, Exception):
+                chunk_errors.append({"row": number, "errors": [{"field": None, "message": str(record)}]})
+                continue
+            row_errors = ExpenseService._resolve_names(record, categories, vendors)
+            try:
+                expense = ExpenseCreate.model_validate(record)
+            except ValidationError as e:
+                row_errors += [
+                    {"field": ".".join(str(part) for part in error["loc"]) or None, "message": error["msg"]}
+                    for error in e.errors()
+                ]
+            if row_errors:
+                chunk_errors.append({"row": number, "errors": row_errors})
+            else:
+                validated.append((number, expense))
+
+        # One lookup per chunk for the shipments its rows reference
+        wanted = {expense.shipment_id for _, expense in validated if 0 < (expense.shipment_id or 0) <= MAX_ID}
+        shipment_ids = set((await db.execute(
+            select(Shipment.id).where(Shipment.id.in_(wanted))
+        )).scalars()) if wanted else set()
+        category_ids, vendor_ids = set(categories.values()), set(vendors.values())
+
+        valid = []
+        for number, expense in validated:
+            row_errors = ExpenseService._reference_errors(expense, category_ids, vendor_ids, shipment_ids)
+            if row_errors:
+                chunk_errors.append({"row": number, "errors": row_errors})
+            else:
+                valid.append(expense)
+        errors.extend(sorted(chunk_errors, key=lambda error: error["row"]))
+
+        if not valid:
+            return 0
+        numbers = await expense_numbers.allocate(db, count=len(valid))
+        rows = [
+            {**expense.model_dump(), "expense_number": number, "amount_usd": expense.amount, "status": "draft"}
+            for expense, number in zip(valid, numbers)
+        ]
+        await db.execute(insert(Expense), rows)
+        await ExpenseRollupService.add_many(db, (SimpleNamespace(**row) for row in rows))
+        return len(rows)
+
+    @staticmethod
+    async def import_expenses(db: AsyncSession, records: Iterable[Tuple[int, object]],
+                              chunk_rows: int = IMPORT_CHUNK_ROWS) -> dict:
+        """Import (row number, record) pairs, keeping good rows and reporting bad ones.
+
+        Records may name their category and vendor instead of giving ids; both
+        are resolved, and given ids checked, against maps loaded once per import.
+        Rows the database would refuse (unknown references, over-long values)
+        are reported instead of inserted, so one bad row never fails the batch.
+        The caller commits.
+        """
+        categories = {
+            name.lower(): category_id
+            for category_id, name in (await db.execute(select(ExpenseCategory.id, ExpenseCategory.name))).all()
+        }
+        vendors = {
+            name.lower(): vendor_id
+            for vendor_id, name in (await db.execute(select(Vendor.id, Vendor.name))).all()
+        }
+
+        imported, errors, chunk = 0, [], []
+        for number, record in records:
+            chunk.append((number, record))
+            if len(chunk) >= chunk_rows:
+                imported += await ExpenseService._insert_chunk(db, chunk, categories, vendors, errors)
+                chunk = []
+        if chunk:
+            imported += await ExpenseService._insert_chunk(db, chunk, categories, vendors, errors)
+
+        return {"imported": imported, "failed": len(errors), "errors": errors}
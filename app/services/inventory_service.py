@@ -1,78 +1,155 @@
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import update, func, text
+from typing import Dict, Iterable, Tuple
 from app.models.inventory import Inventory
+from app.utils.sql import values_table
+
+def _merge_lines(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    """Sum quantities per product so each stock row is touched once"""
+    merged: Dict[int, int] = {}
+    for product_id, quantity in lines:
+        merged[product_id] = merged.get(product_id, 0) + quantity
+    return merged
 
 class InventoryService:
     @staticmethod
-    async def reserve_inventory(db: AsyncSession, product_id: int, location_id: int, quantity: int) -> bool:
-        """Reserve inventory for a shipment"""
+    async def reserve_inventory(db: AsyncSession, product_id: int, location_id: int, quantity: int, commit: bool = True) -> bool:
+        """Reserve inventory for a shipment with one conditional UPDATE"""
         result = await db.execute(
-            select(Inventory).where(
+            update(Inventory)
+            .where(
                 Inventory.product_id == product_id,
-                Inventory.location_id == location_id
+                Inventory.location_id == location_id,
+                Inventory.quantity - func.coalesce(Inventory.reserved_quantity, 0) >= quantity
             )
+            .values(reserved_quantity=func.coalesce(Inventory.reserved_quantity, 0) + quantity)
+            .execution_options(synchronize_session=False)
         )
-        inventory = result.scalar_one_or_none()
-
-        if inventory and inventory.available_quantity >= quantity:
-            inventory.reserved_quantity = (inventory.reserved_quantity or 0) + quantity
+        if result.rowcount != 1:
+            return False
+        if commit:
             await db.commit()
-            await db.refresh(inventory)
-            return True
-        return False
+        return True
 
     @staticmethod
-    async def move_inventory(db: AsyncSession, product_id: int, from_location_id: int, to_location_id: int, quantity: int):
-        """Move inventory from one location to another"""
-        # Get source inventory
-        source_result = await db.execute(
-            select(Inventory).where(
-                Inventory.product_id == product_id,
-                Inventory.location_id == from_location_id
-            )
+    async def reserve_lines(db: AsyncSession, location_id: int, lines: Iterable[Tuple[int, int]], commit: bool = True) -> bool:
+        """Reserve (product_id, quantity) lines at one location, all or nothing.
+
+        A single UPDATE ... FROM reserves every line, guarded so it only applies
+        when every line has enough available stock. If a concurrent reservation
+        still leaves a line short, the session is rolled back and False returned
+        when committing; inside a caller's transaction (commit=False) a 400 is
+        raised instead and the caller's rollback discards the partial update.
+        """
+        merged = _merge_lines(lines)
+        if not merged:
+            return True
+
+        values = values_table(("product_id", "quantity"), merged.items())
+        result = await db.execute(
+            text(f"""
+                UPDATE inventory
+                SET reserved_quantity = COALESCE(inventory.reserved_quantity, 0) + lines.quantity
+                FROM {values} AS lines
+                WHERE inventory.product_id = lines.product_id
+                  AND inventory.location_id = :location_id
+                  AND inventory.quantity - COALESCE(inventory.reserved_quantity, 0) >= lines.quantity
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {values} AS l
+                      LEFT JOIN inventory AS i
+                        ON i.product_id = l.product_id AND i.location_id = :location_id
+                      WHERE i.id IS NULL OR i.quantity - COALESCE(i.reserved_quantity, 0) < l.quantity
+                  )
+            """),
+            {"location_id": location_id}
         )
-        source_inventory = source_result.scalar_one_or_none()
+        if result.rowcount != len(merged):
+            if not commit:
+                raise HTTPException(status_code=400, detail="Insufficient inventory")
+            await db.rollback()
+            return False
+        if commit:
+            await db.commit()
+        return True
+
+    @staticmethod
+    async def transfer_lines(db: AsyncSession, from_location_id: int, to_location_id: int, lines: Iterable[Tuple[int, int]], commit: bool = False):
+        """Move (product_id, quantity) lines between locations with two set-based statements.
 
-        if source_inventory:
-            # Remove from source (including reserved)
-            source_inventory.quantity -= quantity
-            source_inventory.reserved_quantity = max(0, (source_inventory.reserved_quantity or 0) - quantity)
+        Source rows are decremented (consuming their reservations) in one
+        UPDATE ... FROM, destination rows are upserted in one INSERT ... ON
+        CONFLICT. Nothing is committed unless asked, so callers can fold the
+        transfer into their own transaction.
+        """
+        merged = _merge_lines(lines)
+        if not merged:
+            return
+        values = values_table(("product_id", "quantity"), merged.items())
 
-        # Get or create destination inventory
-        dest_result = await db.execute(
-            select(Inventory).where(
-                Inventory.product_id == product_id,
-                Inventory.location_id == to_location_id
-            )
+        await db.execute(
+            text(f"""
+                UPDATE inventory
+                SET quantity = inventory.quantity - lines.quantity,
+                    reserved_quantity = CASE
+                        WHEN COALESCE(inventory.reserved_quantity, 0) > lines.quantity
+                        THEN inventory.reserved_quantity - lines.quantity
+                        ELSE 0
+                    END
+                FROM {values} AS lines
+                WHERE inventory.product_id = lines.product_id
+                  AND inventory.location_id = :from_location_id
+            """),
+            {"from_location_id": from_location_id}
+        )
+        # WHERE 1 = 1 keeps SQLite from reading ON CONFLICT as a join constraint
+        await db.execute(
+            text(f"""
+                INSERT INTO inventory (product_id, location_id, quantity, reserved_quantity, min_stock_level)
+                SELECT lines.product_id, :to_location_id, lines.quantity, 0, :min_stock_level
+                FROM {values} AS lines
+                WHERE 1 = 1
+                ON CONFLICT (product_id, location_id) DO UPDATE
+                SET quantity = inventory.quantity + excluded.quantity,
+                    updated_at = CURRENT_TIMESTAMP
+            """),
+            {"to_location_id": to_location_id, "min_stock_level": Inventory.__table__.c.min_stock_level.default.arg}
         )
-        dest_inventory = dest_result.scalar_one_or_none()
+        if commit:
+            await db.commit()
 
-        if dest_inventory:
-            dest_inventory.quantity += quantity
-        else:
-            # Create new inventory record at destination
-            new_inventory = Inventory(
-                product_id=product_id,
-                location_id=to_location_id,
-                quantity=quantity,
-                reserved_quantity=0
-            )
-            db.add(new_inventory)
+    @staticmethod
+    async def release_lines(db: AsyncSession, location_id: int, lines: Iterable[Tuple[int, int]], commit: bool = False):
+        """Return reserved (product_id, quantity) lines to available stock in one UPDATE"""
+        merged = _merge_lines(lines)
+        if not merged:
+            return
 
-        await db.commit()
+        await db.execute(
+            text(f"""
+                UPDATE inventory
+                SET reserved_quantity = CASE
+                    WHEN COALESCE(inventory.reserved_quantity, 0) > lines.quantity
+                    THEN inventory.reserved_quantity - lines.quantity
+                    ELSE 0
+                END
+                FROM {values_table(("product_id", "quantity"), merged.items())} AS lines
+                WHERE inventory.product_id = lines.product_id
+                  AND inventory.location_id = :location_id
+            """),
+            {"location_id": location_id}
+        )
+        if commit:
+            await db.commit()
 
     @staticmethod
-    async def release_reservation(db: AsyncSession, product_id: int, location_id: int, quantity: int):
-        """Release reserved inventory back to available"""
-        result = await db.execute(
-            select(Inventory).where(
-                Inventory.product_id == product_id,
-                Inventory.location_id == location_id
-            )
+    async def move_inventory(db: AsyncSession, product_id: int, from_location_id: int, to_location_id: int, quantity: int):
+        """Move inventory from one location to another"""
+        await InventoryService.transfer_lines(
+            db, from_location_id, to_location_id, [(product_id, quantity)], commit=True
         )
-        inventory = result.scalar_one_or_none()
 
-        if inventory:
-            inventory.reserved_quantity = max(0, (inventory.reserved_quantity or 0) - quantity)
-            await db.commit()
-            await db.refresh(inventory)
+    @staticmethod
+    async def release_reservation(db: AsyncSession, product_id: int, location_id: int, quantity: int):
+        """Release reserved inventory back to available"""
+        await InventoryService.release_lines(db, location_id, [(product_id, quantity)], commit=True)
@@ -1,19 +1,59 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, func, insert, literal, update
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from app.models.shipment import Shipment
 from app.models.shipment_item import ShipmentItem
+from app.models.inventory import Product
 from app.schemas.shipment import ShipmentCreate, ShipmentUpdate
 from app.services.inventory_service import InventoryService
 from app.core.websocket_manager import manager
+from app.utils.dates import to_naive_utc
+from app.utils.pagination import apply_keyset, split_page
 
 class ShipmentService:
     @staticmethod
-    async def get_all_shipments(db: AsyncSession) -> List[Shipment]:
-        result = await db.execute(select(Shipment))
-        return result.scalars().all()
+    async def list_shipments(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        origin_location_id: Optional[int] = None,
+        destination_location_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Tuple[List[Shipment], Optional[str]]:
+        """Return one keyset page of shipments and the cursor for the next page"""
+        query = ShipmentService.filter_shipments(
+            select(Shipment), status, origin_location_id, destination_location_id, created_from, created_to
+        )
+        result = await db.execute(apply_keyset(query, Shipment.id, limit, cursor))
+        return split_page(result.scalars().all(), limit)
+
+    @staticmethod
+    def filter_shipments(
+        query,
+        status: Optional[str] = None,
+        origin_location_id: Optional[int] = None,
+        destination_location_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        """Apply the listing filters to a query over shipments"""
+        if status is not None:
+            query = query.where(Shipment.status == status)
+        if origin_location_id is not None:
+            query = query.where(Shipment.origin_location_id == origin_location_id)
+        if destination_location_id is not None:
+            query = query.where(Shipment.destination_location_id == destination_location_id)
+        if created_from is not None:
+            query = query.where(Shipment.created_at >= to_naive_utc(created_from))
+        if created_to is not None:
+            query = query.where(Shipment.created_at < to_naive_utc(created_to))
+        return query
 
     @staticmethod
     async def create_shipment(db: AsyncSession, shipment_data: ShipmentCreate) -> Shipment:
@@ -55,21 +95,104 @@ class ShipmentService:
         await db.refresh(shipment)
         return shipment
 
+    @staticmethod
+    async def refresh_totals(db: AsyncSession, shipment_id: int):
+        """Recompute the stored item totals of one shipment in a single UPDATE.
+
+        Called inside every transaction that writes items, so summaries and
+        listings read the columns instead of aggregating items. Recomputing
+        from the (indexed) item rows keeps the distinct product count exact.
+        """
+        items = select(ShipmentItem).where(ShipmentItem.shipment_id == shipment_id).subquery()
+        await db.execute(
+            update(Shipment)
+            .where(Shipment.id == shipment_id)
+            .values(
+                total_value=select(func.coalesce(func.sum(items.c.quantity * items.c.unit_price), 0.0)).scalar_subquery(),
+                total_items=select(func.coalesce(func.sum(items.c.quantity), 0)).scalar_subquery(),
+                unique_products=select(func.count(func.distinct(items.c.product_id))).scalar_subquery(),
+                total_weight_kg=select(
+                    func.coalesce(func.sum(items.c.quantity * func.coalesce(Product.weight_kg, 0.0)), 0.0)
+                ).select_from(items.join(Product, Product.id == items.c.product_id)).scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def copy_items(db: AsyncSession, source_shipment_id: int, target: Shipment, reserve: bool = False) -> int:
+        """Copy every item of one shipment onto another with a single INSERT ... SELECT.
+
+        With reserve set and a pending target, stock for the copied lines is
+        reserved at the target's origin in the same transaction; a short line
+        raises a 400 and the caller's transaction is left to roll back. Returns
+        the number of copied rows. Nothing is committed here.
+        """
+        if reserve and target.status == "pending":
+            lines_result = await db.execute(
+                select(ShipmentItem.product_id, func.sum(ShipmentItem.quantity))
+                .where(ShipmentItem.shipment_id == source_shipment_id)
+                .group_by(ShipmentItem.product_id)
+            )
+            await InventoryService.reserve_lines(
+                db, target.origin_location_id, lines_result.all(), commit=False
+            )
+
+        result = await db.execute(
+            insert(ShipmentItem.__table__).from_select(
+                ["shipment_id", "product_id", "quantity", "unit_price"],
+                select(
+                    literal(target.id), ShipmentItem.product_id,
+                    ShipmentItem.quantity, ShipmentItem.unit_price
+                ).where(ShipmentItem.shipment_id == source_shipment_id)
+            )
+        )
+        await ShipmentService.refresh_totals(db, target.id)
+        return result.rowcount
+
+    @staticmethod
+    async def clone_shipment(db: AsyncSession, source: Shipment, tracking_number: str,
+                             estimated_delivery: Optional[datetime] = None, reserve: bool = False) -> Tuple[Shipment, int]:
+        """Create a pending copy of a shipment header and its items in one transaction"""
+        clone = Shipment(
+            tracking_number=tracking_number,
+            origin_location_id=source.origin_location_id,
+            destination_location_id=source.destination_location_id,
+            status="pending",
+            estimated_delivery=estimated_delivery
+        )
+        db.add(clone)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # A concurrent clone took the tracking number after the caller's check
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Tracking number already exists")
+
+        copied = await ShipmentService.copy_items(db, source.id, clone, reserve=reserve)
+        await db.commit()
+        await db.refresh(clone)
+        return clone, copied
+
     @staticmethod
     async def _handle_status_change(db: AsyncSession, shipment: Shipment, old_status: str, new_status: str):
-        """Handle inventory changes when shipment status changes"""
-        items_result = await db.execute(select(ShipmentItem).where(ShipmentItem.shipment_id == shipment.id))
-        items = items_result.scalars().all()
-
-        if new_status == "dispatched" and old_status == "pending":
-            for item in items:
-                await InventoryService.move_inventory(
-                    db, item.product_id, shipment.origin_location_id,
-                    shipment.destination_location_id, item.quantity
-                )
-
-        elif new_status == "cancelled":
-            for item in items:
-                await InventoryService.release_reservation(
-                    db, item.product_id, shipment.origin_location_id, item.quantity
-                )
\ No newline at end of file
+        """Handle inventory changes when shipment status changes.
+
+        All lines move in set-based statements inside the caller's transaction,
+        so a failure leaves no line half-moved.
+        """
+        if not (new_status == "dispatched" and old_status == "pending") and new_status != "cancelled":
+            return
+
+        lines_result = await db.execute(
+            select(ShipmentItem.product_id, func.sum(ShipmentItem.quantity))
+            .where(ShipmentItem.shipment_id == shipment.id)
+            .group_by(ShipmentItem.product_id)
+        )
+        lines = lines_result.all()
+
+        if new_status == "dispatched":
+            await InventoryService.transfer_lines(
+                db, shipment.origin_location_id, shipment.destination_location_id, lines
+            )
+        else:
+            await InventoryService.release_lines(db, shipment.origin_location_id, lines)
@@ -0,0 +1,36 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth import hash_password, token_cache
+from app.core.principals import principal_cache
+from app.models.user import User, UserRole
+
+class UserService:
+    """Account changes that must drop cached principals.
+
+    Deactivation and password changes also bump token_version, revoking every
+    token issued before them; a role change takes effect on existing tokens.
+    """
+
+    @staticmethod
+    async def deactivate(db: AsyncSession, user: User) -> User:
+        user.is_active = False
+        user.token_version = (user.token_version or 0) + 1
+        await db.commit()
+        principal_cache.invalidate(user.id)
+        token_cache.revoke_subject(str(user.id))
+        return user
+
+    @staticmethod
+    async def change_role(db: AsyncSession, user: User, role: UserRole) -> User:
+        user.role = role
+        await db.commit()
+        principal_cache.invalidate(user.id)
+        return user
+
+    @staticmethod
+    async def change_password(db: AsyncSession, user: User, new_password: str) -> User:
+        user.hashed_password = await hash_password(new_password)
+        user.token_version = (user.token_version or 0) + 1
+        await db.commit()
+        principal_cache.invalidate(user.id)
+        token_cache.revoke_subject(str(user.id))
+        return user
@@ -0,0 +1,67 @@
+"""Row readers for CSV / NDJSON uploads, consumed lazily from the upload's file."""
+import csv
+import io
+import json
+import re
+from typing import BinaryIO, Iterator, Tuple
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# surrogateescape turns each byte that is not valid UTF-8 into one of these
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+
+
+def import_format(filename: str, requested: str = None) -> str:
+    """Explicit format, else the upload's file extension, else CSV"""
+    if requested:
+        return requested
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return "ndjson" if extension in ("ndjson", "jsonl") else "csv"
+
+
+def _invalid_utf8(values) -> bool:
+    return any(isinstance(value, str) and _UNDECODABLE.search(value) for value in values)
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, record) pairs; a record that cannot be parsed is yielded as an Exception.
+
+    Row numbers count data rows from 1 (the CSV header is not a row). Blank
+    values are dropped so schema defaults apply to them. Bytes that are not
+    UTF-8 only fail the rows they appear in.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    if fmt == "csv":
+        rows = csv.DictReader(text)
+        number = 0
+        while True:
+            number += 1
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield number, e
+                continue
+            if _invalid_utf8(row.values()):
+                yield number, ValueError("Row is not valid UTF-8")
+                continue
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        if _invalid_utf8([line]):
+            yield number, ValueError("Line is not valid UTF-8")
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, e
+            continue
+        if not isinstance(record, dict):
+            yield number, ValueError("Each line must be a JSON object")
+            continue
+        yield number, {key: value for key, value in record.items() if value not in ("", None)}
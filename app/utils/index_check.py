@@ -0,0 +1,99 @@
+"""Confirm the hot query paths are served by their indexes.
+
+Run against the configured database with `python -m app.utils.index_check`.
+On Postgres sequential scans are disabled for the check, so the result says
+whether an index *can* serve the query even on small or empty tables.
+"""
+import asyncio
+from datetime import date
+
+from sqlalchemy import select, func, text
+
+from app.models.inventory import Inventory
+from app.models.shipment import Shipment
+from app.models.shipment_item import ShipmentItem
+from app.models.location_tracking import LocationUpdate
+from app.models.expense import Expense
+
+# name -> (query, index expected in its plan)
+HOT_QUERIES = {
+    "shipment_listing_by_status": (
+        select(Shipment).where(Shipment.status == "pending").order_by(Shipment.id.desc()).limit(51),
+        "ix_shipments_status_id",
+    ),
+    "location_history": (
+        select(LocationUpdate).where(LocationUpdate.shipment_id == 1).order_by(LocationUpdate.timestamp),
+        "ix_location_updates_shipment_id_timestamp",
+    ),
+    "inventory_lookup": (
+        select(Inventory).where(Inventory.product_id == 1, Inventory.location_id == 1),
+        "uq_inventory_product_id_location_id",
+    ),
+    "shipment_items": (
+        select(ShipmentItem).where(ShipmentItem.shipment_id == 1),
+        "ix_shipment_items_shipment_id_product_id",
+    ),
+    "expenses_in_period": (
+        select(func.sum(Expense.amount_usd)).where(Expense.expense_date.between(date(2024, 1, 1), date(2024, 1, 31))),
+        "ix_expenses_expense_date",
+    ),
+    "approved_in_period": (
+        select(func.sum(Expense.amount_usd))
+        .where(Expense.status == "approved", Expense.expense_date.between(date(2024, 1, 1), date(2024, 1, 31))),
+        "ix_expenses_status_expense_date",
+    ),
+    "expenses_by_category": (
+        select(func.sum(Expense.amount_usd)).where(Expense.category_id == 1),
+        "ix_expenses_category_id_expense_date",
+    ),
+    "expense_report_by_vendor": (
+        select(func.sum(Expense.amount_usd)).where(Expense.vendor_id == 1, Expense.expense_date >= date(2024, 1, 1)),
+        "ix_expenses_vendor_id_expense_date",
+    ),
+    "shipment_expenses": (
+        select(func.sum(Expense.amount_usd)).where(Expense.shipment_id == 1),
+        "ix_expenses_shipment_id",
+    ),
+    "approval_queue": (
+        select(Expense.id, Expense.expense_number, Expense.amount, Expense.status)
+        .where(Expense.status == "submitted").order_by(Expense.id.desc()).limit(51),
+        "ix_expenses_status_id",
+    ),
+}
+
+async def explain(conn, query) -> str:
+    """Query plan text for a statement on the connection's dialect"""
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    result = await conn.execute(text(prefix + sql))
+    # SQLite puts the plan text in the last column, Postgres has only one column
+    return "\n".join(str(row[-1]) for row in result.all())
+
+async def check_hot_query_indexes(conn) -> dict:
+    """Map each hot query to (expected index, whether the plan uses it, plan text)"""
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+    report = {}
+    for name, (query, index_name) in HOT_QUERIES.items():
+        plan = await explain(conn, query)
+        report[name] = (index_name, index_name in plan, plan)
+    return report
+
+async def main():
+    from app.core import database
+
+    await database.init_database()
+    async with database.engine.begin() as conn:
+        report = await check_hot_query_indexes(conn)
+
+    failures = 0
+    for name, (index_name, used, plan) in report.items():
+        print(f"{'OK  ' if used else 'MISS'} {name}: {index_name}")
+        if not used:
+            failures += 1
+            print("     " + plan.replace("\n", "\n     "))
+    raise SystemExit(1 if failures else 0)
+
+if __name__ == "__main__":
+    asyncio.run(main())
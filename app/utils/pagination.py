@@ -0,0 +1,43 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(row_id: int) -> str:
+    """Encode the keyset position of a row as an opaque token"""
+    raw = json.dumps({"id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a token produced by encode_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded.encode()))["id"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, id_column, limit: int, cursor: Optional[str] = None):
+    """Order newest first and seek past the cursor.
+
+    Ids are assigned in insertion order, so ordering on the primary key gives
+    created_at order without the tie-breaking problems of timestamp keys.
+    One extra row is fetched so the caller can tell whether another page exists.
+    """
+    if cursor:
+        query = query.where(id_column < decode_cursor(cursor))
+    return query.order_by(id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: list, limit: int):
+    """Trim the look-ahead row and build the cursor for the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
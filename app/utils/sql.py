@@ -0,0 +1,50 @@
+import math
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import Integer
+
+
+class time_bucket(FunctionElement):
+    """Index of the fixed-width time bucket a timestamp falls into.
+
+    time_bucket(column, origin, width) counts whole `width`-second steps since
+    `origin` (Unix epoch seconds), treating naive timestamps as UTC.
+    """
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(time_bucket)
+def _time_bucket_default(element, compiler, **kw):
+    column, origin, width = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"FLOOR((EXTRACT(EPOCH FROM {column}) - {origin}) / {width})"
+
+
+@compiles(time_bucket, "sqlite")
+def _time_bucket_sqlite(element, compiler, **kw):
+    column, origin, width = (compiler.process(arg, **kw) for arg in element.clauses)
+    # Timestamps are never before origin, so truncation is a floor here
+    return f"CAST((((julianday({column}) - 2440587.5) * 86400.0) - {origin}) / {width} AS INTEGER)"
+
+
+def _numeric_literal(value) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"Only numbers can be inlined, got {value!r}")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"Cannot inline non-finite number {value!r}")
+    return repr(value)
+
+
+def values_table(columns, rows) -> str:
+    """Render rows of numbers as a derived table with the given column names.
+
+    Inlining keeps set-based statements to one round trip without hitting bind
+    parameter limits on large batches; only ints and floats are accepted, so
+    the result is safe to splice into SQL. The statement should start with its
+    DML keyword rather than WITH, so pysqlite still opens a transaction for it.
+    """
+    body = ", ".join("(" + ", ".join(_numeric_literal(v) for v in row) + ")" for row in rows)
+    # Both SQLite and Postgres name VALUES columns column1, column2, ...
+    names = ", ".join(f"column{index} AS {name}" for index, name in enumerate(columns, start=1))
+    return f"(SELECT {names} FROM (VALUES {body}) AS v)"
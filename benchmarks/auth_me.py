@@ -0,0 +1,77 @@
+"""Compare authenticated request cost with and without the verified-token cache.
+
+    SECRET_KEY=... DATABASE_URL=... python benchmarks/auth_me.py [requests]
+
+Runs GET /api/v1/auth/me in-process against an in-memory SQLite database, so
+the numbers isolate application overhead rather than network or database time.
+The principal cache stays on in both runs; only JWT verification differs.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from app.core import auth
+from app.core.database import Base, get_db
+from app.models.user import User
+
+
+async def run(requests: int):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with Session() as session:
+        user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+        session.add(user)
+        await session.commit()
+
+    async def override_get_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    token = auth.create_access_token(data={"sub": str(user.id)})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/api/v1/auth/me", headers=headers)
+
+        results = {}
+        for label, max_entries in (("uncached", 0), ("cached", auth.settings.TOKEN_CACHE_MAX_ENTRIES)):
+            auth.token_cache.clear()
+            auth.token_cache.max_entries = max_entries
+
+            start = time.perf_counter()
+            for _ in range(requests):
+                auth.verify_token(token)
+            verify_us = (time.perf_counter() - start) / requests * 1e6
+
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = await client.get("/api/v1/auth/me", headers=headers)
+                assert response.status_code == 200
+            request_us = (time.perf_counter() - start) / requests * 1e6
+            results[label] = (verify_us, request_us)
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"{requests} iterations")
+    print(f"{'':10}{'verify_token':>16}{'GET /auth/me':>16}")
+    for label, (verify_us, request_us) in results.items():
+        print(f"{label:10}{verify_us:>13.1f} us{request_us:>13.1f} us")
+    saved = results["uncached"][0] - results["cached"][0]
+    print(f"cache saves {saved:.1f} us per authenticated request")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
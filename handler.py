@@ -1,24 +1,44 @@
+import time
+
+_init_started = time.perf_counter()
+
+import asyncio
 import json
 import logging
+import os
+
+from app.core.coldstart import ImportProfiler, report_cold_start
+
+# COLDSTART_PROFILE=1 logs the import cost of every module loaded during init
+profiler = ImportProfiler.install() if os.getenv("COLDSTART_PROFILE") else None
+
 from mangum import Mangum
 
 # Configure logging for Lambda
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    # Test bcrypt import early to catch issues
-    import bcrypt
-    logger.info(f"bcrypt imported successfully, version: {getattr(bcrypt, '__version__', 'Unknown')}")
-    
-    from passlib.context import CryptContext
-    # Test passlib + bcrypt combination
-    test_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    logger.info("passlib + bcrypt combination working")
-    
-except Exception as e:
-    logger.error(f"bcrypt/passlib import error: {e}")
-    # This will help diagnose the exact issue in CloudWatch logs
+from app.core.config import settings
+
+def _bcrypt_self_test():
+    """Check the passlib + bcrypt combination and log the versions"""
+    try:
+        # Test bcrypt import early to catch issues
+        import bcrypt
+        logger.info(f"bcrypt imported successfully, version: {getattr(bcrypt, '__version__', 'Unknown')}")
+
+        from passlib.context import CryptContext
+        # Test passlib + bcrypt combination
+        CryptContext(schemes=["bcrypt"], deprecated="auto").hash("self-test")
+        logger.info("passlib + bcrypt combination working")
+
+    except Exception as e:
+        logger.error(f"bcrypt/passlib import error: {e}")
+        # This will help diagnose the exact issue in CloudWatch logs
+
+# Deferred by default: passlib loads the bcrypt backend on the first hash anyway
+if settings.BCRYPT_SELFTEST_AT_INIT:
+    _bcrypt_self_test()
 
 try:
     from main import app
@@ -27,26 +47,58 @@ except Exception as e:
     logger.error(f"FastAPI app import error: {e}")
     raise
 
+from app.core.database import warm_pool
+
+# Built once per container and reused by every warm invocation
+mangum_handler = Mangum(app, lifespan="off")
+
+# Mangum drives each request with asyncio.get_event_loop(); pin one loop for the
+# container so the pooled connections opened below stay usable across invocations
+loop = asyncio.new_event_loop()
+asyncio.set_event_loop(loop)
+
+def _init_database():
+    """Create the engine and pre-open pooled connections during the init phase"""
+    try:
+        loop.run_until_complete(warm_pool(settings.DB_PREWARM_CONNECTIONS))
+        logger.info(f"Database pool warmed with {settings.DB_PREWARM_CONNECTIONS} connection(s)")
+    except Exception as e:
+        # get_db will retry lazily on the first request
+        logger.error(f"Database warm-up failed: {e}")
+
+if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    _init_database()
+
+cold_start_ms = report_cold_start(
+    _init_started, os.getenv("AWS_LAMBDA_FUNCTION_NAME", "local"), profiler
+)
+
+def is_keep_warm_event(event) -> bool:
+    """Scheduled pings that only exist to keep the container warm"""
+    if not isinstance(event, dict):
+        return False
+    return bool(event.get("keep_warm")) or event.get("source") == "serverless-plugin-warmup"
+
 # AWS Lambda handler with better error handling
 def handler(event, context):
     """
     AWS Lambda handler with enhanced error logging
     """
+    if is_keep_warm_event(event):
+        return {"statusCode": 200, "body": json.dumps({"status": "warm"})}
+
     try:
         logger.info(f"Lambda event: {json.dumps(event, default=str)[:500]}...")  # Truncate for logging
-        
-        # Create Mangum handler
-        mangum_handler = Mangum(app, lifespan="off")
-        
+
         # Process the request
         response = mangum_handler(event, context)
-        
+
         logger.info(f"Response status: {response.get('statusCode', 'Unknown')}")
         return response
-        
+
     except Exception as e:
         logger.error(f"Handler error: {str(e)}", exc_info=True)
-        
+
         # Return a proper HTTP error response
         return {
             "statusCode": 500,
@@ -1,9 +1,12 @@
 import os
 from fastapi import FastAPI
 from app.core.config import settings
-from app.core.database import get_db, init_database, Base
-from app.api.v1.router import api_router
+from app.core.database import get_db, init_database, Base, pool_metrics
+from app.api.v1.router import api_router, include_lazy_routers
 from app.api.v1.websocket import router as websocket_router
+from app.core.websocket_manager import manager
+from app.core.broadcast import create_backend
+from app.core.response_cache import dashboard_cache
 
 app = FastAPI(
     title="ShipTrack API",
@@ -13,12 +16,21 @@ app = FastAPI(
 
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
+include_lazy_routers(app, settings.API_V1_STR, lazy=settings.LAZY_ROUTERS)
 app.include_router(websocket_router)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     await init_database()
+    if settings.WS_BROADCAST_BACKEND != "memory":
+        await manager.start_backend(create_backend(
+            settings.WS_BROADCAST_BACKEND, settings.DATABASE_URL, settings.WS_BROKER_ADDRESS
+        ))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await manager.stop_backend()
 
 @app.get("/")
 async def root():
@@ -28,6 +40,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return pool_metrics.snapshot()
+
+@app.get("/metrics/response-cache")
+async def response_cache_metrics():
+    return dashboard_cache.snapshot()
+
 @app.get("/db-test")
 async def test_db():
     try:
@@ -27,6 +27,10 @@ from app.models.location_tracking import LocationUpdate
 from app.models.expense import Expense, ExpenseCategory, Vendor, Budget, BudgetLineItem
 from app.models.user import User, UserRole
 from app.core.auth import get_password_hash, create_access_token
+from app.services.expense_numbers import expense_numbers
+from app.core.response_cache import dashboard_cache
+from app.core.principals import principal_cache
+from app.core.auth import token_cache
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 test_engine = create_async_engine(
@@ -41,6 +45,11 @@ TestSessionLocal = sessionmaker(
 
 @pytest_asyncio.fixture(scope="function")
 async def test_db():
+    # Blocks reserved against a previous test's database would collide with a fresh counter
+    expense_numbers.reset()
+    dashboard_cache.clear()
+    principal_cache.clear()
+    token_cache.clear()
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
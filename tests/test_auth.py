@@ -33,3 +33,120 @@ async def test_get_current_user(client: AsyncClient, auth_headers):
     assert response.status_code == 200
     data = response.json()
     assert "email" in data
+
+@pytest.mark.asyncio
+async def test_cached_principal_skips_database(client: AsyncClient, auth_headers, monkeypatch):
+    """A warm principal answers /auth/me without opening a session"""
+    import app.core.deps as deps
+
+    assert (await client.get("/api/v1/auth/me", headers=auth_headers)).status_code == 200
+
+    async def no_session(*args, **kwargs):
+        raise AssertionError("principal should come from the cache")
+    monkeypatch.setattr(deps, "_load_principal", no_session)
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "testuser@example.com"
+
+@pytest.mark.asyncio
+async def test_account_changes_invalidate_principal(client: AsyncClient, test_user, auth_headers):
+    """Role changes show up at once; deactivation and password changes revoke old tokens"""
+    from conftest import TestSessionLocal
+    from app.services.user_service import UserService
+
+    assert (await client.get("/api/v1/auth/me", headers=auth_headers)).json()["role"] == "employee"
+
+    async with TestSessionLocal() as session:
+        user = await session.get(User, test_user.id)
+        await UserService.change_role(session, user, UserRole.MANAGER)
+    assert (await client.get("/api/v1/auth/me", headers=auth_headers)).json()["role"] == "manager"
+
+    async with TestSessionLocal() as session:
+        user = await session.get(User, test_user.id)
+        await UserService.change_password(session, user, "newpass456")
+    revoked = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert revoked.status_code == 401
+
+    login = await client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "newpass456"})
+    fresh_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get("/api/v1/auth/me", headers=fresh_headers)).status_code == 200
+
+    async with TestSessionLocal() as session:
+        user = await session.get(User, test_user.id)
+        await UserService.deactivate(session, user)
+    assert (await client.get("/api/v1/auth/me", headers=fresh_headers)).status_code == 401
+
+@pytest.mark.asyncio
+async def test_hashing_runs_off_the_event_loop():
+    """bcrypt runs on the bounded pool, never more than BCRYPT_MAX_WORKERS at once"""
+    import asyncio
+    import threading
+    from app.core import auth
+    from app.core.config import settings
+
+    threads = set()
+    running = [0, 0]
+
+    def fake_hash(password):
+        threads.add(threading.current_thread().name)
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        threading.Event().wait(0.02)
+        running[0] -= 1
+        return password
+
+    await asyncio.gather(*[auth._run_hashing(fake_hash, "x") for _ in range(6)])
+    assert all(name.startswith("bcrypt") for name in threads)
+    assert running[1] <= settings.BCRYPT_MAX_WORKERS
+
+@pytest.mark.asyncio
+async def test_login_rehashes_when_cost_changes(client: AsyncClient, test_user, monkeypatch):
+    """A hash made with an outdated cost is replaced on the next successful login"""
+    from passlib.context import CryptContext
+    from conftest import TestSessionLocal
+    from app.core import auth
+
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4))
+    response = await client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpass123"})
+    assert response.status_code == 200
+
+    async with TestSessionLocal() as session:
+        user = await session.get(User, test_user.id)
+        assert user.hashed_password.startswith("$2b$04$")
+
+    wrong = await client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "nope"})
+    assert wrong.status_code == 401
+
+def test_verified_token_cache_expiry_and_revocation(monkeypatch):
+    """Verified claims are reused until exp and can be revoked per token or subject"""
+    from datetime import timedelta
+    from fastapi import HTTPException
+    from app.core import auth
+
+    token = auth.create_access_token(data={"sub": "7"}, expires_delta=timedelta(minutes=5))
+    other = auth.create_access_token(data={"sub": "7", "ver": 1})
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("claims should come from the cache")
+
+    assert auth.verify_token(token)["sub"] == "7"
+    monkeypatch.setattr(auth.jwt, "decode", no_decode)
+    assert auth.verify_token(token)["sub"] == "7"
+    assert auth.token_cache.hits == 1
+    monkeypatch.undo()
+
+    # Past its exp the entry is dropped, and the full check rejects expired tokens
+    monkeypatch.setattr(auth.time, "time", lambda: 2 ** 40)
+    assert auth.token_cache.get(token) is None
+    monkeypatch.undo()
+    expired = auth.create_access_token(data={"sub": "7"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        auth.verify_token(expired)
+
+    auth.verify_token(other)
+    auth.token_cache.revoke_subject("7")
+    assert auth.token_cache.get(other) is None
+    auth.verify_token(other)
+    auth.token_cache.revoke(other)
+    assert auth.token_cache.get(other) is None
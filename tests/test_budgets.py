@@ -0,0 +1,96 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.expense import Budget, BudgetLineItem
+from conftest import TestSessionLocal
+
+
+async def create_budget_with_lines(name, start, end, lines, fiscal_year=2024):
+    async with TestSessionLocal() as session:
+        budget = Budget(name=name, fiscal_year=fiscal_year, period_type="monthly",
+                        start_date=start, end_date=end, total_budget=Decimal(sum(lines.values())))
+        session.add(budget)
+        await session.flush()
+        session.add_all([
+            BudgetLineItem(budget_id=budget.id, category_id=category_id, budgeted_amount=Decimal(amount))
+            for category_id, amount in lines.items()
+        ])
+        await session.commit()
+        return budget.id
+
+
+async def create_expense(client, category_id, amount, expense_date, approve=True):
+    expense_id = (await client.post("/api/v1/expenses/", json={
+        "amount": amount, "category_id": category_id, "expense_date": expense_date, "description": "Budget test"
+    })).json()["id"]
+    if approve:
+        await client.post(f"/api/v1/expenses/{expense_id}/submit")
+        await client.post(f"/api/v1/expenses/{expense_id}/approve", json={})
+    return expense_id
+
+
+@pytest.mark.asyncio
+async def test_batch_variance_by_line_item(client: AsyncClient):
+    """Variance for every budget comes back per line item category, counting approved spend only"""
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    tolls = (await client.post("/api/v1/expense-categories/", json={"name": "Tolls", "code": "TOLL"})).json()["id"]
+    parking = (await client.post("/api/v1/expense-categories/", json={"name": "Parking", "code": "PARK"})).json()["id"]
+
+    january = await create_budget_with_lines("January", date(2024, 1, 1), date(2024, 1, 31), {fuel: 200, tolls: 100})
+    february = await create_budget_with_lines("February", date(2024, 2, 1), date(2024, 2, 29), {fuel: 100})
+    await create_budget_with_lines("Next year", date(2025, 1, 1), date(2025, 1, 31), {fuel: 100}, fiscal_year=2025)
+
+    await create_expense(client, fuel, "150.00", "2024-01-10")
+    await create_expense(client, parking, "20.00", "2024-01-11")
+    await create_expense(client, tolls, "999.00", "2024-01-12", approve=False)
+    await create_expense(client, fuel, "130.00", "2024-02-05")
+
+    response = await client.get("/api/v1/budgets/variance", params={"fiscal_year": 2024})
+    assert response.status_code == 200
+    report = {budget["budget_id"]: budget for budget in response.json()}
+    assert set(report) == {january, february}
+
+    jan = report[january]
+    assert (jan["actual_amount"], jan["unbudgeted_actual_amount"]) == (170.0, 20.0)
+    lines = {line["category_name"]: line for line in jan["lines"]}
+    assert (lines["Fuel"]["actual_amount"], lines["Fuel"]["variance_percentage"]) == (150.0, 25.0)
+    assert (lines["Tolls"]["actual_amount"], lines["Tolls"]["variance"]) == (0.0, 100.0)
+
+    feb_line = report[february]["lines"][0]
+    assert (feb_line["variance"], feb_line["variance_percentage"]) == (-30.0, -30.0)
+
+    only_feb = (await client.get("/api/v1/budgets/variance", params={"budget_id": [february]})).json()
+    assert [budget["budget_id"] for budget in only_feb] == [february]
+
+    # The single-budget endpoint reports the same approved, per-category actuals
+    single = (await client.get(f"/api/v1/budgets/{january}/variance")).json()
+    assert single == jan
+    assert (await client.get("/api/v1/budgets/999999/variance")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_line_item_actuals_follow_approvals(client: AsyncClient):
+    """Approving, editing and rejecting expenses keeps BudgetLineItem actuals current"""
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    budget_id = await create_budget_with_lines("March", date(2024, 3, 1), date(2024, 3, 31), {fuel: 200})
+
+    async def line_item():
+        async with TestSessionLocal() as session:
+            line = (await session.execute(
+                select(BudgetLineItem).where(BudgetLineItem.budget_id == budget_id)
+            )).scalar_one()
+            return float(line.actual_amount), line.variance_percentage and float(line.variance_percentage)
+
+    first = await create_expense(client, fuel, "50.00", "2024-03-03")
+    second = await create_expense(client, fuel, "30.00", "2024-03-04")
+    await create_expense(client, fuel, "500.00", "2024-04-01")
+    assert await line_item() == (80.0, 60.0)
+
+    await client.put(f"/api/v1/expenses/{first}", json={"amount": "70.00"})
+    assert await line_item() == (100.0, 50.0)
+
+    await client.post(f"/api/v1/expenses/{second}/reject", json={"reason": "Duplicate"})
+    assert await line_item() == (70.0, 65.0)
@@ -0,0 +1,35 @@
+import sys
+import pytest
+from httpx import AsyncClient
+
+from app.core.coldstart import ImportProfiler
+
+
+def test_import_profiler_times_new_modules():
+    """The profiler records self and inclusive time for modules imported while installed"""
+    sys.modules.pop("colorsys", None)
+    profiler = ImportProfiler.install()
+    try:
+        import colorsys  # noqa: F401
+    finally:
+        profiler.uninstall()
+
+    assert "colorsys" in profiler.timings
+    assert sys.modules["colorsys"].__loader__.__class__.__name__ != "_TimedLoader"
+    top = profiler.top(5)
+    assert top[0]["inclusive_ms"] >= top[0]["self_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_routers_load_on_first_request(client: AsyncClient):
+    """Budgets and dashboard routes are served once their router is loaded on demand"""
+    response = await client.get("/api/v1/budgets/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await client.get("/api/v1/dashboard/expense-trends")
+    assert response.status_code == 200
+    assert response.json() == {"expense_trends": []}
+
+    paths = (await client.get("/openapi.json")).json()["paths"]
+    assert "/api/v1/budgets/{budget_id}/variance" in paths
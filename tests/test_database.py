@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import InstrumentedQueuePool, pool_metrics, pool_options
+
+
+def test_pool_profiles():
+    """Named profiles map onto pool classes and sizes"""
+    assert pool_options("pooler") == {"poolclass": NullPool}
+
+    serverless = pool_options("serverless")
+    assert serverless["poolclass"] is InstrumentedQueuePool
+    assert (serverless["pool_size"], serverless["max_overflow"]) == (1, 0)
+
+    server = pool_options("server")
+    assert server["pool_size"] > 1
+
+    with pytest.raises(ValueError):
+        pool_options("bogus")
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_record_wait_and_saturation():
+    """Checkouts that queue behind a busy pool show up as wait time and full saturation"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0
+    )
+    pool_metrics.reset()
+
+    async def hold(seconds):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(seconds)
+
+    await asyncio.gather(hold(0.05), hold(0))
+    await engine.dispose()
+
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["capacity"] == 1
+    assert snapshot["peak_saturation"] == 1.0
+    assert (snapshot["checked_out"], snapshot["saturation"]) == (0, 0.0)
+    assert snapshot["max_wait_ms"] >= 40
@@ -130,3 +130,362 @@ async def test_expense_reporting(client: AsyncClient):
     assert float(report["total_expenses"]) == 220.75
     assert report["expense_count"] == 3
     assert "expenses_by_category" in report
+
+@pytest.mark.asyncio
+async def test_expense_numbers_use_current_year(client: AsyncClient):
+    """Expense numbers carry the current year rather than a fixed one"""
+    category_response = await client.post("/api/v1/expense-categories/", json={"name": "Tolls", "code": "TOLL"})
+    expense_data = {
+        "amount": "10.00",
+        "category_id": category_response.json()["id"],
+        "expense_date": "2024-01-15",
+        "description": "Bridge toll"
+    }
+
+    first = (await client.post("/api/v1/expenses/", json=expense_data)).json()
+    second = (await client.post("/api/v1/expenses/", json=expense_data)).json()
+
+    year = date.today().year
+    assert (first["expense_number"], second["expense_number"]) == (f"EXP-{year}-0001", f"EXP-{year}-0002")
+
+@pytest.mark.asyncio
+async def test_concurrent_allocations_share_one_refill(client: AsyncClient):
+    """Concurrent allocations get distinct numbers and wait on a single block reservation"""
+    import asyncio
+    from conftest import TestSessionLocal
+    from app.services.expense_numbers import ExpenseNumberAllocator
+
+    allocator = ExpenseNumberAllocator(block_size=50)
+    async with TestSessionLocal() as session:
+        results = await asyncio.gather(*[allocator.allocate(session, year=2031) for _ in range(30)])
+
+    numbers = sorted(number for result in results for number in result)
+    assert numbers == [f"EXP-2031-{n:04d}" for n in range(1, 31)]
+
+@pytest.mark.asyncio
+async def test_expense_number_blocks(client: AsyncClient):
+    """Numbers come from blocks reserved on the counter row, and N can be reserved at once"""
+    from conftest import TestSessionLocal
+    from app.models.expense import ExpenseNumberCounter
+    from app.services.expense_numbers import ExpenseNumberAllocator
+
+    allocator = ExpenseNumberAllocator(block_size=10)
+    other_worker = ExpenseNumberAllocator(block_size=10)
+    async with TestSessionLocal() as session:
+        first = await allocator.allocate(session, year=2030)
+        second = await allocator.allocate(session, year=2030)
+        assert (first, second) == (["EXP-2030-0001"], ["EXP-2030-0002"])
+
+        # A second worker reserves its own block
+        assert await other_worker.allocate(session, year=2030) == ["EXP-2030-0011"]
+
+        # A bulk request larger than the block reserves exactly what it needs
+        bulk = await allocator.allocate(session, count=25, year=2030)
+        assert bulk[:8] == [f"EXP-2030-{n:04d}" for n in range(3, 11)]
+        assert bulk[8:] == [f"EXP-2030-{n:04d}" for n in range(21, 38)]
+
+        counter = await session.get(ExpenseNumberCounter, "EXP-2030")
+        assert counter.next_value == 38
+
+@pytest.mark.asyncio
+async def test_expense_numbers_on_single_connection_pool(tmp_path):
+    """Blocks are reserved on the caller's connection, so a one-connection pool is enough"""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from app.core.database import Base
+    from app.services.expense_numbers import ExpenseNumberAllocator
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'numbers.db'}",
+        poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=1
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    allocator = ExpenseNumberAllocator(block_size=10)
+
+    async with Session() as session:
+        await session.execute(text("SELECT 1"))
+        assert await allocator.allocate(session, count=2, year=2032) == ["EXP-2032-0001", "EXP-2032-0002"]
+        # Rolling back undoes the reservation and forgets the block
+        await session.rollback()
+        assert await allocator.allocate(session, count=2, year=2032) == ["EXP-2032-0001", "EXP-2032-0002"]
+        await session.commit()
+
+    # The committed block's spare numbers serve the next session
+    async with Session() as session:
+        assert await allocator.allocate(session, year=2032) == ["EXP-2032-0003"]
+        await session.commit()
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_expense_report_breakdowns_and_filters(client: AsyncClient):
+    """The report breaks totals down by category and status and honours its filters"""
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    tolls = (await client.post("/api/v1/expense-categories/", json={"name": "Tolls", "code": "TOLL"})).json()["id"]
+    vendor = (await client.post("/api/v1/vendors/", json={"name": "Shell"})).json()["id"]
+
+    expenses = [
+        {"amount": "100.00", "category_id": fuel, "expense_date": "2024-01-10", "vendor_id": vendor},
+        {"amount": "50.00", "category_id": fuel, "expense_date": "2024-02-10", "vendor_id": vendor},
+        {"amount": "30.00", "category_id": tolls, "expense_date": "2024-02-11"},
+    ]
+    ids = []
+    for expense_data in expenses:
+        expense_data["description"] = "Report test"
+        ids.append((await client.post("/api/v1/expenses/", json=expense_data)).json()["id"])
+    await client.post(f"/api/v1/expenses/{ids[0]}/submit")
+
+    report = (await client.get("/api/v1/reports/expenses")).json()
+    assert float(report["total_expenses"]) == 180.0
+    assert report["expense_count"] == 3
+    assert float(report["average_expense"]) == 60.0
+    assert report["expenses_by_category"] == {"Fuel": 150.0, "Tolls": 30.0}
+    assert report["expenses_by_status"] == {"draft": 2, "submitted": 1}
+
+    filtered = (await client.get("/api/v1/reports/expenses", params={
+        "date_from": "2024-02-01", "date_to": "2024-02-28", "vendor_id": vendor
+    })).json()
+    assert filtered["expense_count"] == 1
+    assert filtered["expenses_by_category"] == {"Fuel": 50.0}
+
+    by_status = (await client.get("/api/v1/reports/expenses", params={"status": "submitted"})).json()
+    assert float(by_status["total_expenses"]) == 100.0
+
+    empty = (await client.get("/api/v1/reports/expenses", params={"shipment_id": 999})).json()
+    assert (empty["expense_count"], float(empty["average_expense"])) == (0, 0.0)
+    assert empty["expenses_by_category"] == {}
+
+@pytest.mark.asyncio
+async def test_dashboard_reads_maintained_rollup(client: AsyncClient):
+    """Expense writes keep the monthly rollup in step with a full rebuild"""
+    from sqlalchemy import select
+    from conftest import TestSessionLocal
+    from app.models.expense import ExpenseMonthlyRollup
+    from app.services.expense_rollup import ExpenseRollupService
+
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    tolls = (await client.post("/api/v1/expense-categories/", json={"name": "Tolls", "code": "TOLL"})).json()["id"]
+    this_month = date.today().replace(day=1).isoformat()
+
+    ids = []
+    for amount, category_id, expense_date in [("100.00", fuel, this_month), ("40.00", tolls, this_month), ("25.00", fuel, "2024-01-15")]:
+        response = await client.post("/api/v1/expenses/", json={
+            "amount": amount, "category_id": category_id, "expense_date": expense_date, "description": "Rollup"
+        })
+        ids.append(response.json()["id"])
+
+    await client.post(f"/api/v1/expenses/{ids[0]}/submit")
+    await client.put(f"/api/v1/expenses/{ids[1]}", json={"amount": "60.00", "category_id": fuel})
+    await client.post(f"/api/v1/expenses/{ids[2]}/submit")
+    await client.post(f"/api/v1/expenses/{ids[2]}/approve", json={})
+
+    kpis = (await client.get("/api/v1/dashboard/financial-kpis")).json()
+    assert float(kpis["total_monthly_expenses"]) == 160.0
+    assert kpis["pending_approvals_count"] == 1
+    assert kpis["top_expense_categories"] == [{"category": "Fuel", "amount": 185.0}]
+
+    trends = (await client.get("/api/v1/dashboard/expense-trends")).json()["expense_trends"]
+    assert trends[0] == {"period": "2024-01", "amount": 25.0}
+    assert trends[-1]["amount"] == 160.0
+
+    def rows(result):
+        return sorted((r.year, r.month, r.category_id, r.status, float(r.total_usd), r.expense_count)
+                      for r in result.scalars().all() if r.expense_count)
+
+    async with TestSessionLocal() as session:
+        maintained = rows(await session.execute(select(ExpenseMonthlyRollup)))
+        await ExpenseRollupService.rebuild(session)
+        await session.commit()
+        rebuilt = rows(await session.execute(select(ExpenseMonthlyRollup)))
+    assert maintained == rebuilt
+
+@pytest.mark.asyncio
+async def test_expense_listing_pages_filters_and_fields(client: AsyncClient):
+    """Listing pages newest first, filters, and returns only the requested fields"""
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    tolls = (await client.post("/api/v1/expense-categories/", json={"name": "Tolls", "code": "TOLL"})).json()["id"]
+
+    ids = []
+    for day in range(1, 6):
+        response = await client.post("/api/v1/expenses/", json={
+            "amount": f"{day}0.00", "category_id": fuel if day % 2 else tolls,
+            "expense_date": f"2024-05-0{day}", "description": "Listing", "notes": "long notes"
+        })
+        ids.append(response.json()["id"])
+    for expense_id in ids[:2]:
+        await client.post(f"/api/v1/expenses/{expense_id}/submit")
+
+    first = (await client.get("/api/v1/expenses/", params={"limit": 3})).json()
+    assert [item["id"] for item in first["items"]] == ids[::-1][:3]
+    assert first["items"][0]["notes"] == "long notes"
+    second = (await client.get("/api/v1/expenses/", params={"limit": 3, "cursor": first["next_cursor"]})).json()
+    assert [item["id"] for item in second["items"]] == ids[1::-1]
+    assert second["next_cursor"] is None
+
+    queue = (await client.get("/api/v1/expenses/", params={
+        "status": "submitted", "fields": "id,expense_number,amount,status"
+    })).json()
+    assert [set(item) for item in queue["items"]] == [{"id", "expense_number", "amount", "status"}] * 2
+    assert {item["status"] for item in queue["items"]} == {"submitted"}
+
+    narrowed = (await client.get("/api/v1/expenses/", params={
+        "category_id": fuel, "date_from": "2024-05-02", "date_to": "2024-05-05", "fields": "expense_date"
+    })).json()
+    assert narrowed["items"] == [{"expense_date": "2024-05-05"}, {"expense_date": "2024-05-03"}]
+
+    bad = await client.get("/api/v1/expenses/", params={"fields": "id,password"})
+    assert bad.status_code == 400
+
+@pytest.mark.asyncio
+async def test_bulk_import_csv_reports_bad_rows(client: AsyncClient):
+    """A CSV import keeps the good rows, resolves names and reports bad rows by number"""
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    vendor = (await client.post("/api/v1/vendors/", json={"name": "Shell"})).json()["id"]
+    await client.post("/api/v1/expenses/", json={
+        "amount": "5.00", "category_id": fuel, "expense_date": "2024-03-01", "description": "Manual"
+    })
+
+    body = (
+        "amount,category,vendor,expense_date,description,invoice_number\n"
+        "100.00,fuel,Shell,2024-03-02,Diesel,INV-1\n"
+        ",Fuel,Shell,2024-03-03,Missing amount,\n"
+        "20.00,Snacks,,2024-03-04,Unknown category,\n"
+        "30.50,Fuel,Corner Garage,2024-03-05,New vendor,\n"
+    )
+    response = await client.post("/api/v1/expenses/import", files={"file": ("expenses.csv", body, "text/csv")})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert result["failed"] == 2
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["errors"][0]["field"] == "amount"
+    assert result["errors"][1]["errors"][0]["field"] == "category"
+
+    expenses = (await client.get("/api/v1/expenses/", params={"date_from": "2024-03-02"})).json()["items"]
+    by_description = {expense["description"]: expense for expense in expenses}
+    assert set(by_description) == {"Diesel", "New vendor"}
+    assert by_description["Diesel"]["vendor_id"] == vendor
+    assert by_description["Diesel"]["category_id"] == fuel
+    assert by_description["New vendor"]["vendor_id"] is None
+    assert by_description["New vendor"]["vendor_name"] == "Corner Garage"
+    assert by_description["Diesel"]["status"] == "draft"
+
+    numbers = [expense["expense_number"] for expense in (await client.get("/api/v1/expenses/")).json()["items"]]
+    assert len(set(numbers)) == 3
+
+    report = (await client.get("/api/v1/reports/expenses", params={
+        "date_from": "2024-03-01", "date_to": "2024-03-31"
+    })).json()
+    assert float(report["total_expenses"]) == 135.5
+    assert report["expense_count"] == 3
+
+    references = (
+        "amount,category_id,vendor_id,shipment_id,currency,expense_date,description\n"
+        f"1.00,{fuel + 100},,,USD,2024-03-06,Unknown category id\n"
+        f"1.00,{fuel},{vendor + 100},,USD,2024-03-06,Unknown vendor id\n"
+        f"1.00,{fuel},,99999999999,USD,2024-03-06,Unknown shipment id\n"
+        f"1.00,{fuel},,,DOLLARS,2024-03-06,Currency too long\n"
+        f"1.00,{fuel},{vendor},,EUR,2024-03-06,Valid\n"
+    )
+    result = (await client.post("/api/v1/expenses/import", files={"file": ("refs.csv", references, "text/csv")})).json()
+    assert result["imported"] == 1
+    assert [(error["row"], error["errors"][0]["field"]) for error in result["errors"]] == [
+        (1, "category_id"), (2, "vendor_id"), (3, "shipment_id"), (4, "currency")
+    ]
+
+@pytest.mark.asyncio
+async def test_bulk_import_ndjson_in_chunks(client: AsyncClient):
+    """NDJSON imports span several chunks and keep the rollup in step"""
+    from sqlalchemy import select
+    from conftest import TestSessionLocal
+    from app.models.expense import ExpenseMonthlyRollup
+    from app.services.expense_rollup import ExpenseRollupService
+    from app.services.expense_service import ExpenseService
+    from app.utils.imports import iter_records
+    import io, json
+
+    fuel = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    lines = [json.dumps({"amount": "10.00", "category_id": fuel, "expense_date": "2024-04-01", "description": f"Row {i}"})
+             for i in range(7)]
+    lines[3] = "{not json"
+    body = ("\n".join(lines) + "\n\n").encode()
+
+    async with TestSessionLocal() as session:
+        result = await ExpenseService.import_expenses(session, iter_records(io.BytesIO(body), "ndjson"), chunk_rows=2)
+        await session.commit()
+    assert result["imported"] == 6
+    assert [error["row"] for error in result["errors"]] == [4]
+
+    response = await client.post("/api/v1/expenses/import", params={"format": "ndjson"},
+                                 files={"file": ("upload.txt", lines[0] + "\n[1, 2]\n", "text/plain")})
+    assert response.json()["imported"] == 1
+    assert response.json()["errors"] == [{"row": 2, "errors": [{"field": None, "message": "Each line must be a JSON object"}]}]
+
+    def rows(result):
+        return sorted((r.year, r.month, r.category_id, r.status, float(r.total_usd), r.expense_count)
+                      for r in result.scalars().all() if r.expense_count)
+
+    async with TestSessionLocal() as session:
+        maintained = rows(await session.execute(select(ExpenseMonthlyRollup)))
+        await ExpenseRollupService.rebuild(session)
+        await session.commit()
+        rebuilt = rows(await session.execute(select(ExpenseMonthlyRollup)))
+    assert maintained == rebuilt == [(2024, 4, fuel, "draft", 70.0, 7)]
+
+@pytest.mark.asyncio
+async def test_bulk_import_on_single_connection_pool(tmp_path):
+    """An import runs entirely on the request's connection, as on the serverless pool profile"""
+    import io
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from app.core.database import Base
+    from app.models.expense import ExpenseCategory
+    from app.services.expense_service import ExpenseService
+    from app.utils.imports import iter_records
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'import.db'}",
+        poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=1
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as session:
+        session.add(ExpenseCategory(name="Fuel", code="FUEL"))
+        await session.commit()
+        body = b"amount,category,expense_date,description\n12.00,Fuel,2024-06-01,Diesel\n"
+        result = await ExpenseService.import_expenses(session, iter_records(io.BytesIO(body), "csv"))
+        await session.commit()
+    await engine.dispose()
+
+    assert (result["imported"], result["errors"]) == (1, [])
+
+@pytest.mark.asyncio
+async def test_bulk_import_rejects_undecodable_and_nul_rows(client: AsyncClient):
+    """Bytes that are not UTF-8 and NUL characters fail only their own rows"""
+    await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})
+
+    body = (
+        b"amount,category,expense_date,description\n"
+        b"10.00,Fuel,2024-07-01,Good\n"
+        b"11.00,Fuel,2024-07-02,Caf\xff receipt\n"
+        b"12.00,Fuel,2024-07-03,Also good\n"
+    )
+    result = (await client.post("/api/v1/expenses/import", files={"file": ("card.csv", body, "text/csv")})).json()
+    assert result["imported"] == 2
+    assert result["errors"] == [{"row": 2, "errors": [{"field": None, "message": "Row is not valid UTF-8"}]}]
+
+    lines = (
+        b'{"amount": "1.00", "category": "Fuel", "expense_date": "2024-07-04", "description": "Bad \xff byte"}\n'
+        b'{"amount": "1.00", "category": "Fuel", "expense_date": "2024-07-04", "description": "NUL \\u0000 here"}\n'
+        b'{"amount": "1.00", "category": "Fuel", "expense_date": "2024-07-04", "description": "Fine"}\n'
+    )
+    result = (await client.post("/api/v1/expenses/import", files={"file": ("rows.ndjson", lines, "application/x-ndjson")})).json()
+    assert result["imported"] == 1
+    assert [error["row"] for error in result["errors"]] == [1, 2]
+    assert result["errors"][1]["errors"][0]["field"] == "description"
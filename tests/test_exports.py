@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.expense import Expense
+from app.utils.export import stream_rows
+from conftest import TestSessionLocal
+from test_location_tracking import create_shipment
+
+
+async def create_expenses(client: AsyncClient, count: int) -> int:
+    category_id = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    for day in range(1, count + 1):
+        await client.post("/api/v1/expenses/", json={
+            "amount": f"{day}.50", "category_id": category_id,
+            "expense_date": f"2024-06-{day:02d}", "description": f"Fill-up, pump {day}"
+        })
+    return category_id
+
+
+@pytest.mark.asyncio
+async def test_export_expenses_csv_with_columns_and_filters(client: AsyncClient):
+    """CSV export writes a header and the selected columns for matching rows, oldest first"""
+    await create_expenses(client, 4)
+
+    response = await client.get("/api/v1/exports/expenses", params={
+        "columns": "id,amount,expense_date,description", "date_from": "2024-06-02", "date_to": "2024-06-03"
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "expenses.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "amount", "expense_date", "description"]
+    assert [row[1:] for row in rows[1:]] == [
+        ["2.50", "2024-06-02", "Fill-up, pump 2"],
+        ["3.50", "2024-06-03", "Fill-up, pump 3"],
+    ]
+
+    bad = await client.get("/api/v1/exports/expenses", params={"columns": "id,secret"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_for_shipments_and_locations(client: AsyncClient):
+    """NDJSON exports emit one JSON object per row"""
+    shipment_id = await create_shipment(client, "EXPORT001")
+    await client.post("/api/v1/shipments/locations/batch", json={"pings": [
+        {"shipment_id": shipment_id, "latitude": 1.5, "longitude": 2.5, "timestamp": "2024-01-15T10:00:00Z"},
+        {"shipment_id": shipment_id, "latitude": 3.5, "longitude": 4.5, "timestamp": "2024-01-15T11:00:00Z"},
+    ]})
+
+    shipments = await client.get("/api/v1/exports/shipments", params={"format": "ndjson", "columns": "id,tracking_number,status"})
+    assert shipments.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in shipments.text.splitlines()] == [
+        {"id": shipment_id, "tracking_number": "EXPORT001", "status": "pending"}
+    ]
+
+    locations = await client.get("/api/v1/exports/location-updates", params={
+        "format": "ndjson", "columns": "latitude,timestamp", "shipment_id": shipment_id, "from": "2024-01-15T10:30:00Z"
+    })
+    assert [json.loads(line) for line in locations.text.splitlines()] == [
+        {"latitude": 3.5, "timestamp": "2024-01-15T11:00:00"}
+    ]
+
+    items = await client.get("/api/v1/exports/shipment-items", params={"shipment_id": shipment_id})
+    assert items.text.splitlines() == ["shipment_id,product_id,quantity,unit_price,id,created_at,updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_in_fixed_size_chunks(client: AsyncClient):
+    """Rows are read through the cursor and written one partition at a time"""
+    await create_expenses(client, 7)
+
+    async with TestSessionLocal() as session:
+        query = select(Expense.__table__.c.id).order_by(Expense.__table__.c.id)
+        chunks = [chunk async for chunk in stream_rows(session, query, ["id"], "ndjson", chunk_rows=3)]
+
+    assert [chunk.count("\n") for chunk in chunks] == [3, 3, 1]
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import handler
+
+
+def test_keep_warm_event_skips_fastapi(monkeypatch):
+    """Keep-warm pings are answered without invoking the ASGI adapter"""
+    def fail(event, context):
+        raise AssertionError("keep-warm event should not reach Mangum")
+
+    monkeypatch.setattr(handler, "mangum_handler", fail)
+
+    response = handler.handler({"keep_warm": True}, None)
+    assert response["statusCode"] == 200
+
+    response = handler.handler({"source": "serverless-plugin-warmup"}, None)
+    assert response["statusCode"] == 200
+
+
+def test_http_event_uses_shared_adapter():
+    """Warm invocations reuse the adapter built at import time"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    event = {
+        "version": "2.0",
+        "routeKey": "GET /health",
+        "rawPath": "/health",
+        "rawQueryString": "",
+        "headers": {"host": "test"},
+        "requestContext": {
+            "http": {"method": "GET", "path": "/health", "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1"},
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+    adapter = handler.mangum_handler
+
+    for _ in range(2):
+        response = handler.handler(event, None)
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"]) == {"status": "healthy"}
+
+    assert handler.mangum_handler is adapter
+    assert not handler.is_keep_warm_event(event)
+    loop.close()
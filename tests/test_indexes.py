@@ -0,0 +1,14 @@
+import pytest
+
+from app.utils.index_check import check_hot_query_indexes
+from conftest import test_engine
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(test_db):
+    """Every hot query path is planned against its supporting index"""
+    async with test_engine.connect() as conn:
+        report = await check_hot_query_indexes(conn)
+
+    missing = {name: plan for name, (_, used, plan) in report.items() if not used}
+    assert not missing
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+from app.services.inventory_service import InventoryService
+from conftest import TestSessionLocal
+
+
+async def seed_stock(client: AsyncClient, stock: dict) -> tuple:
+    """Create a location and products with the given on-hand quantities"""
+    location = await client.post("/api/v1/inventory/locations/", json={"name": "DC", "location_type": "warehouse"})
+    location_id = location.json()["id"]
+    product_ids = []
+    for sku, quantity in stock.items():
+        product = await client.post("/api/v1/inventory/products/", json={"name": sku, "sku": sku, "unit_price": 1.0})
+        product_id = product.json()["id"]
+        await client.post("/api/v1/inventory/", json={
+            "product_id": product_id, "location_id": location_id, "quantity": quantity
+        })
+        product_ids.append(product_id)
+    return location_id, product_ids
+
+
+async def reserved(client: AsyncClient, location_id: int, product_id: int) -> int:
+    response = await client.get(f"/api/v1/inventory/location/{location_id}/product/{product_id}")
+    return response.json()["reserved_quantity"]
+
+
+@pytest.mark.asyncio
+async def test_reserve_inventory_is_conditional(client: AsyncClient):
+    """Concurrent reservations never take more than the available stock"""
+    location_id, (product_id,) = await seed_stock(client, {"SKU-A": 10})
+
+    async def attempt():
+        async with TestSessionLocal() as session:
+            return await InventoryService.reserve_inventory(session, product_id, location_id, 4)
+
+    results = await asyncio.gather(*(attempt() for _ in range(5)))
+
+    assert sorted(results) == [False, False, False, True, True]
+    assert await reserved(client, location_id, product_id) == 8
+
+
+@pytest.mark.asyncio
+async def test_reserve_lines_all_or_nothing(client: AsyncClient):
+    """A multi-line reservation applies every line or none of them"""
+    location_id, (first, second) = await seed_stock(client, {"SKU-B": 5, "SKU-C": 2})
+
+    short = await client.post("/api/v1/inventory/reserve", json={
+        "location_id": location_id,
+        "lines": [{"product_id": first, "quantity": 3}, {"product_id": second, "quantity": 3}]
+    })
+    assert short.status_code == 400
+    assert await reserved(client, location_id, first) == 0
+
+    ok = await client.post("/api/v1/inventory/reserve", json={
+        "location_id": location_id,
+        "lines": [
+            {"product_id": first, "quantity": 3},
+            {"product_id": first, "quantity": 2},
+            {"product_id": second, "quantity": 2}
+        ]
+    })
+    assert ok.status_code == 200
+    assert await reserved(client, location_id, first) == 5
+    assert await reserved(client, location_id, second) == 2
+
+
+@pytest.mark.asyncio
+async def test_reserve_lines_inside_caller_transaction_raises(client: AsyncClient):
+    """With commit=False a short reservation raises and leaves the caller's pending work alone"""
+    from fastapi import HTTPException
+    from app.models.inventory import Location
+
+    location_id, (product_id,) = await seed_stock(client, {"SKU-D": 1})
+
+    async with TestSessionLocal() as session:
+        pending = Location(name="Pending", location_type="warehouse")
+        session.add(pending)
+        await session.flush()
+
+        with pytest.raises(HTTPException) as error:
+            await InventoryService.reserve_lines(session, location_id, [(product_id, 5)], commit=False)
+        assert error.value.status_code == 400
+        assert session.in_transaction() and pending in session
+        await session.rollback()
@@ -0,0 +1,87 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.websocket_manager import manager
+
+
+async def create_shipment(client: AsyncClient, tracking_number: str) -> int:
+    origin = await client.post("/api/v1/inventory/locations/", json={"name": "Yard", "location_type": "warehouse"})
+    dest = await client.post("/api/v1/inventory/locations/", json={"name": "Port", "location_type": "port"})
+    response = await client.post("/api/v1/shipments/", json={
+        "tracking_number": tracking_number,
+        "origin_location_id": origin.json()["id"],
+        "destination_location_id": dest.json()["id"]
+    })
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_batch_location_ingest(client: AsyncClient, monkeypatch):
+    """Test batched pings are stored together and coalesced into one broadcast per shipment"""
+    first_id = await create_shipment(client, "GPS001")
+    second_id = await create_shipment(client, "GPS002")
+
+    broadcasts = []
+
+    async def record_broadcast(message, shipment_id):
+        broadcasts.append((shipment_id, message))
+
+    monkeypatch.setattr(manager, "broadcast_to_shipment", record_broadcast)
+    monkeypatch.setitem(manager.shipment_subscriptions, first_id, {"client"})
+
+    pings = [
+        {"shipment_id": first_id, "latitude": 1.0, "longitude": 1.0, "timestamp": "2024-01-15T10:00:00Z"},
+        {"shipment_id": first_id, "latitude": 3.0, "longitude": 3.0, "timestamp": "2024-01-15T10:00:10Z"},
+        {"shipment_id": first_id, "latitude": 2.0, "longitude": 2.0, "timestamp": "2024-01-15T10:00:05Z"},
+        {"shipment_id": second_id, "latitude": 5.0, "longitude": 5.0, "timestamp": "2024-01-15T10:00:00"},
+        {"shipment_id": 999999, "latitude": 0.0, "longitude": 0.0, "timestamp": "2024-01-15T10:00:00"},
+        {"shipment_id": second_id, "latitude": 0.0, "longitude": 0.0, "timestamp": "not-a-time"},
+    ]
+    response = await client.post("/api/v1/shipments/locations/batch", json={"pings": pings})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 4
+    assert [r["index"] for r in data["rejected"]] == [4, 5]
+
+    history = await client.get(f"/api/v1/shipments/{first_id}/locations")
+    assert len(history.json()) == 3
+
+    # Only the subscribed shipment is broadcast, once, with its newest point
+    assert len(broadcasts) == 1
+    shipment_id, message = broadcasts[0]
+    assert shipment_id == first_id
+    assert message["latitude"] == 3.0
+    assert message["tracking_number"] == "GPS001"
+
+
+@pytest.mark.asyncio
+async def test_location_history_range_and_downsampling(client: AsyncClient):
+    """Test history is time-ordered, bounded by from/to and bucketed by max_points"""
+    shipment_id = await create_shipment(client, "GPS003")
+
+    # 600 pings, one every 5 seconds, posted out of order
+    pings = [
+        {"shipment_id": shipment_id, "latitude": i / 100, "longitude": i / 100,
+         "timestamp": f"2024-01-15T{10 + i * 5 // 3600:02d}:{i * 5 // 60 % 60:02d}:{i * 5 % 60:02d}"}
+        for i in reversed(range(600))
+    ]
+    await client.post("/api/v1/shipments/locations/batch", json={"pings": pings})
+
+    full = (await client.get(f"/api/v1/shipments/{shipment_id}/locations")).json()
+    assert len(full) == 600
+    assert [p["timestamp"] for p in full] == sorted(p["timestamp"] for p in full)
+
+    bounded = (await client.get(f"/api/v1/shipments/{shipment_id}/locations", params={
+        "from": "2024-01-15T10:10:00", "to": "2024-01-15T10:19:59"
+    })).json()
+    assert len(bounded) == 120
+    assert bounded[0]["timestamp"] == "2024-01-15T10:10:00"
+
+    sampled = (await client.get(f"/api/v1/shipments/{shipment_id}/locations", params={"max_points": 50})).json()
+    assert 45 <= len(sampled) <= 50
+    assert sampled[-1]["timestamp"] == full[-1]["timestamp"]
+    assert [p["timestamp"] for p in sampled] == sorted(p["timestamp"] for p in sampled)
+
+    per_minute = (await client.get(f"/api/v1/shipments/{shipment_id}/locations", params={"resolution": 60})).json()
+    assert len(per_minute) == 50
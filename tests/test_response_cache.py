@@ -0,0 +1,61 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.response_cache import ResponseCache
+
+
+def test_lru_eviction_ttl_and_versions(monkeypatch):
+    """Entries are evicted least-recently-used first, expire and go stale on bump"""
+    now = [100.0]
+    monkeypatch.setattr("app.core.response_cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=2, ttl=10)
+
+    cache.set("a", b"1", cache.version)
+    cache.set("b", b"2", cache.version)
+    assert cache.get("a").body == b"1"
+    cache.set("c", b"3", cache.version)
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+
+    # A body computed before a write is returned but never stored
+    version = cache.version
+    cache.bump()
+    cache.set("d", b"4", version)
+    assert cache.get("d") is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_etag_and_write_invalidation(client: AsyncClient):
+    """Dashboards answer repeat polls from the cache, with 304s, until an expense write"""
+    first = await client.get("/api/v1/dashboard/expense-trends")
+    etag = first.headers["etag"]
+    assert first.json() == {"expense_trends": []}
+
+    revalidated = await client.get("/api/v1/dashboard/expense-trends", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    for header in (f'"other", W/{etag}', "*"):
+        matched = await client.get("/api/v1/dashboard/expense-trends", headers={"If-None-Match": header})
+        assert matched.status_code == 304
+    partial = await client.get("/api/v1/dashboard/expense-trends", headers={"If-None-Match": etag[:-2] + '"'})
+    assert partial.status_code == 200
+
+    category_id = (await client.post("/api/v1/expense-categories/", json={"name": "Fuel", "code": "FUEL"})).json()["id"]
+    await client.post("/api/v1/expenses/", json={
+        "amount": "12.50", "category_id": category_id, "expense_date": "2024-03-02", "description": "Diesel"
+    })
+
+    fresh = await client.get("/api/v1/dashboard/expense-trends", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json() == {"expense_trends": [{"period": "2024-03", "amount": 12.5}]}
+
+    kpis = await client.get("/api/v1/dashboard/financial-kpis")
+    assert kpis.json()["pending_approvals_count"] == 0
+
+    metrics = (await client.get("/metrics/response-cache")).json()
+    assert (metrics["hits"], metrics["misses"]) == (4, 3)
+    assert metrics["entries"] == 2
@@ -0,0 +1,155 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def setup_pending_shipment(client: AsyncClient, tracking_number: str, stock: dict) -> tuple:
+    """Create a pending shipment whose origin holds the given stock per SKU"""
+    origin = (await client.post("/api/v1/inventory/locations/", json={"name": "Items Origin", "location_type": "warehouse"})).json()["id"]
+    dest = (await client.post("/api/v1/inventory/locations/", json={"name": "Items Dest", "location_type": "store"})).json()["id"]
+    products = []
+    for sku, quantity in stock.items():
+        product = (await client.post("/api/v1/inventory/products/", json={
+            "name": sku, "sku": sku, "unit_price": 1.0, "weight_kg": 0.5
+        })).json()["id"]
+        await client.post("/api/v1/inventory/", json={"product_id": product, "location_id": origin, "quantity": quantity})
+        products.append(product)
+    shipment = (await client.post("/api/v1/shipments/", json={
+        "tracking_number": tracking_number,
+        "origin_location_id": origin,
+        "destination_location_id": dest
+    })).json()["id"]
+    return shipment, origin, products
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_items_reserves_stock(client: AsyncClient):
+    """Bulk insert returns every created row and reserves stock for all lines"""
+    shipment, origin, (first, second) = await setup_pending_shipment(client, "BULK001", {"BULK-A": 100, "BULK-B": 100})
+
+    items = [{"product_id": first if i % 2 else second, "quantity": 1, "unit_price": 2.0} for i in range(150)]
+    response = await client.post(f"/api/v1/shipments/{shipment}/items/bulk", json={"items": items})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["created_items"]) == 150
+    assert data["total_value"] == 300.0
+    assert [item["product_id"] for item in data["created_items"]] == [item["product_id"] for item in items]
+    assert all(item["shipment_id"] == shipment and item["id"] for item in data["created_items"])
+
+    inventory = (await client.get(f"/api/v1/inventory/location/{origin}/product/{first}")).json()
+    assert inventory["reserved_quantity"] == 75
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_items_rolls_back_when_short(client: AsyncClient):
+    """One short line rejects the whole batch and reserves nothing"""
+    shipment, origin, (first, second) = await setup_pending_shipment(client, "BULK002", {"BULK-C": 10, "BULK-D": 1})
+
+    response = await client.post(f"/api/v1/shipments/{shipment}/items/bulk", json={"items": [
+        {"product_id": first, "quantity": 5, "unit_price": 1.0},
+        {"product_id": second, "quantity": 2, "unit_price": 1.0}
+    ]})
+
+    assert response.status_code == 400
+    assert (await client.get(f"/api/v1/shipments/{shipment}/items")).json() == []
+    inventory = (await client.get(f"/api/v1/inventory/location/{origin}/product/{first}")).json()
+    assert inventory["reserved_quantity"] == 0
+
+
+@pytest.mark.asyncio
+async def test_copy_items_with_reservation(client: AsyncClient):
+    """Copying runs server-side, reports the row count and can reserve stock"""
+    source, origin, (product,) = await setup_pending_shipment(client, "COPY001", {"COPY-A": 20})
+    await client.post(f"/api/v1/shipments/{source}/items/bulk", json={"items": [
+        {"product_id": product, "quantity": 3, "unit_price": 1.5},
+        {"product_id": product, "quantity": 4, "unit_price": 1.5}
+    ]})
+    target = (await client.post("/api/v1/shipments/", json={
+        "tracking_number": "COPY002", "origin_location_id": origin, "destination_location_id": origin
+    })).json()["id"]
+
+    response = await client.post(f"/api/v1/shipments/{target}/items/copy", json={
+        "source_shipment_id": source, "reserve_inventory": True
+    })
+    assert response.status_code == 200
+    assert response.json() == {"copied_items": 2}
+
+    items = (await client.get(f"/api/v1/shipments/{target}/items")).json()
+    assert sorted(item["quantity"] for item in items) == [3, 4]
+    inventory = (await client.get(f"/api/v1/inventory/location/{origin}/product/{product}")).json()
+    assert inventory["reserved_quantity"] == 14
+
+    missing = await client.post("/api/v1/shipments/999999/items/copy", json={"source_shipment_id": source})
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_clone_shipment(client: AsyncClient):
+    """Cloning copies the header and every item into a new pending shipment"""
+    source, origin, (product,) = await setup_pending_shipment(client, "CLONE001", {"CLONE-A": 5})
+    await client.post(f"/api/v1/shipments/{source}/items", json={"product_id": product, "quantity": 3, "unit_price": 2.0})
+
+    response = await client.post(f"/api/v1/shipments/{source}/clone", json={"tracking_number": "CLONE002"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["copied_items"] == 1
+    assert data["shipment"]["tracking_number"] == "CLONE002"
+    assert data["shipment"]["origin_location_id"] == origin
+    assert data["shipment"]["status"] == "pending"
+
+    short = await client.post(f"/api/v1/shipments/{source}/clone", json={
+        "tracking_number": "CLONE003", "reserve_inventory": True
+    })
+    assert short.status_code == 400
+    assert (await client.get("/api/v1/shipments/track/CLONE003")).status_code == 404
+    duplicate = await client.post(f"/api/v1/shipments/{source}/clone", json={"tracking_number": "CLONE002"})
+    assert duplicate.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_clone_shipment_tracking_number_race(client: AsyncClient):
+    """A clone that loses the race for a tracking number gets a 400, not a 500"""
+    from fastapi import HTTPException
+    from app.services.shipment_service import ShipmentService
+    from conftest import TestSessionLocal
+
+    source, _, _ = await setup_pending_shipment(client, "RACE001", {"RACE-A": 5})
+    await client.post(f"/api/v1/shipments/{source}/clone", json={"tracking_number": "RACE002"})
+
+    # Skip the endpoint's pre-check, as a concurrent request that passed it would
+    async with TestSessionLocal() as session:
+        shipment = await ShipmentService.get_shipment_by_id(session, source)
+        with pytest.raises(HTTPException) as error:
+            await ShipmentService.clone_shipment(session, shipment, "RACE002")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_summary_totals_follow_item_writes(client: AsyncClient):
+    """Stored totals track add, update, delete, bulk and copy, counting distinct products"""
+    shipment, origin, (first, second) = await setup_pending_shipment(client, "SUM001", {"SUM-A": 50, "SUM-B": 50})
+
+    added = (await client.post(f"/api/v1/shipments/{shipment}/items", json={"product_id": first, "quantity": 2, "unit_price": 10.0})).json()
+    await client.post(f"/api/v1/shipments/{shipment}/items/bulk", json={"items": [
+        {"product_id": first, "quantity": 1, "unit_price": 10.0},
+        {"product_id": second, "quantity": 4, "unit_price": 5.0}
+    ]})
+    summary = (await client.get(f"/api/v1/shipments/{shipment}/summary")).json()
+    assert summary == {"total_value": 50.0, "total_items": 7, "unique_products": 2, "total_weight_kg": 3.5}
+
+    await client.patch(f"/api/v1/shipments/{shipment}/items/{added['id']}", json={"quantity": 5})
+    summary = (await client.get(f"/api/v1/shipments/{shipment}/summary")).json()
+    assert (summary["total_value"], summary["total_items"], summary["unique_products"]) == (80.0, 10, 2)
+
+    await client.delete(f"/api/v1/shipments/{shipment}/items/{added['id']}")
+    summary = (await client.get(f"/api/v1/shipments/{shipment}/summary")).json()
+    assert (summary["total_value"], summary["total_items"], summary["unique_products"]) == (30.0, 5, 2)
+
+    listed = (await client.get(f"/api/v1/shipments/{shipment}")).json()
+    assert listed["total_value"] == 30.0
+
+    clone = (await client.post(f"/api/v1/shipments/{shipment}/clone", json={"tracking_number": "SUM002"})).json()
+    assert clone["shipment"]["total_items"] == 5
+    assert clone["shipment"]["unique_products"] == 2
+
+    assert (await client.get("/api/v1/shipments/999999/summary")).status_code == 404
@@ -7,7 +7,7 @@ async def test_get_shipments_empty_list(client: AsyncClient):
     response = await client.get("/api/v1/shipments/")
 
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
 
 @pytest.mark.asyncio
 async def test_create_shipment_success(client: AsyncClient):
@@ -105,3 +105,107 @@ async def test_update_shipment_status(client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "delivered"
+
+@pytest.mark.asyncio
+async def test_list_shipments_keyset_pagination(client: AsyncClient):
+    """Test paging through shipments with the opaque cursor and filters"""
+    origin_response = await client.post("/api/v1/inventory/locations/", json={"name": "Page Origin", "location_type": "warehouse"})
+    dest_response = await client.post("/api/v1/inventory/locations/", json={"name": "Page Dest", "location_type": "port"})
+    origin_id = origin_response.json()["id"]
+    dest_id = dest_response.json()["id"]
+
+    for i in range(5):
+        await client.post("/api/v1/shipments/", json={
+            "tracking_number": f"PAGE{i}",
+            "origin_location_id": origin_id,
+            "destination_location_id": dest_id,
+            "status": "pending" if i % 2 == 0 else "in_transit"
+        })
+
+    first = await client.get("/api/v1/shipments/", params={"limit": 2})
+    assert first.status_code == 200
+    first_page = first.json()
+    assert [s["tracking_number"] for s in first_page["items"]] == ["PAGE4", "PAGE3"]
+    assert first_page["next_cursor"]
+
+    seen = [s["tracking_number"] for s in first_page["items"]]
+    cursor = first_page["next_cursor"]
+    while cursor:
+        page = (await client.get("/api/v1/shipments/", params={"limit": 2, "cursor": cursor})).json()
+        seen.extend(s["tracking_number"] for s in page["items"])
+        cursor = page["next_cursor"]
+    assert seen == ["PAGE4", "PAGE3", "PAGE2", "PAGE1", "PAGE0"]
+
+    filtered = await client.get("/api/v1/shipments/", params={"status": "in_transit"})
+    assert [s["tracking_number"] for s in filtered.json()["items"]] == ["PAGE3", "PAGE1"]
+
+    # Offset-aware bounds are compared in UTC against the naive created_at column
+    from datetime import datetime, timedelta, timezone
+    local_now = datetime.now(timezone(timedelta(hours=5)))
+    recent = await client.get("/api/v1/shipments/", params={
+        "created_from": (local_now - timedelta(hours=1)).isoformat(),
+        "created_to": (local_now + timedelta(hours=1)).isoformat()
+    })
+    assert len(recent.json()["items"]) == 5
+    older = await client.get("/api/v1/shipments/", params={"created_to": (local_now - timedelta(hours=1)).isoformat()})
+    assert older.json()["items"] == []
+
+    assert (await client.get("/api/v1/shipments/", params={"cursor": "not-a-cursor"})).status_code == 400
+    assert (await client.get("/api/v1/shipments/", params={"limit": 1000})).status_code == 422
+
+async def _stocked_shipment(client: AsyncClient, tracking_number: str, stock: int, lines: list):
+    """Create origin/destination, stock one product at origin and a pending shipment with items"""
+    origin = (await client.post("/api/v1/inventory/locations/", json={"name": "Stock Origin", "location_type": "warehouse"})).json()["id"]
+    dest = (await client.post("/api/v1/inventory/locations/", json={"name": "Stock Dest", "location_type": "store"})).json()["id"]
+    product = (await client.post("/api/v1/inventory/products/", json={"name": tracking_number, "sku": tracking_number, "unit_price": 2.5})).json()["id"]
+    await client.post("/api/v1/inventory/", json={"product_id": product, "location_id": origin, "quantity": stock})
+    shipment = (await client.post("/api/v1/shipments/", json={
+        "tracking_number": tracking_number,
+        "origin_location_id": origin,
+        "destination_location_id": dest
+    })).json()["id"]
+    for quantity in lines:
+        response = await client.post(f"/api/v1/shipments/{shipment}/items", json={
+            "product_id": product, "quantity": quantity, "unit_price": 2.5
+        })
+        assert response.status_code == 200
+    return shipment, product, origin, dest
+
+@pytest.mark.asyncio
+async def test_dispatch_moves_all_lines(client: AsyncClient):
+    """Dispatching moves every line from origin to destination in one transaction"""
+    shipment, product, origin, dest = await _stocked_shipment(client, "MOVE001", 10, [3, 4])
+    await client.post("/api/v1/inventory/", json={"product_id": product, "location_id": dest, "quantity": 1})
+
+    response = await client.patch(f"/api/v1/shipments/{shipment}", json={"status": "dispatched"})
+    assert response.status_code == 200
+
+    source = (await client.get(f"/api/v1/inventory/location/{origin}/product/{product}")).json()
+    target = (await client.get(f"/api/v1/inventory/location/{dest}/product/{product}")).json()
+    assert (source["quantity"], source["reserved_quantity"]) == (3, 0)
+    assert (target["quantity"], target["reserved_quantity"]) == (8, 0)
+
+@pytest.mark.asyncio
+async def test_dispatch_creates_destination_stock_with_model_defaults(client: AsyncClient):
+    """A destination without a stock row gets one carrying the model's default minimum level"""
+    from app.models.inventory import Inventory
+
+    shipment, product, _, dest = await _stocked_shipment(client, "MOVE002", 10, [4])
+    await client.patch(f"/api/v1/shipments/{shipment}", json={"status": "dispatched"})
+
+    target = (await client.get(f"/api/v1/inventory/location/{dest}/product/{product}")).json()
+    assert target["quantity"] == 4
+    assert target["min_stock_level"] == Inventory.__table__.c.min_stock_level.default.arg
+
+@pytest.mark.asyncio
+async def test_cancel_releases_reservations(client: AsyncClient):
+    """Cancelling a pending shipment returns its reserved stock"""
+    shipment, product, origin, _ = await _stocked_shipment(client, "CANCEL001", 10, [2, 5])
+
+    reserved = (await client.get(f"/api/v1/inventory/location/{origin}/product/{product}")).json()
+    assert reserved["reserved_quantity"] == 7
+
+    await client.patch(f"/api/v1/shipments/{shipment}", json={"status": "cancelled"})
+
+    released = (await client.get(f"/api/v1/inventory/location/{origin}/product/{product}")).json()
+    assert (released["quantity"], released["reserved_quantity"]) == (10, 0)
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import pytest
+
+from app.core import websocket_manager
+from app.core.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.stalled = stalled
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def subscribe(manager, client_id, shipment_id):
+    manager.shipment_subscriptions.setdefault(shipment_id, set()).add(client_id)
+    manager.client_subscriptions[client_id].add(shipment_id)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serialises_once(monkeypatch):
+    """Broadcasting to many subscribers encodes the payload a single time"""
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(5)]
+    for index, websocket in enumerate(sockets):
+        await manager.connect(websocket, f"client-{index}")
+        await subscribe(manager, f"client-{index}", 7)
+
+    calls = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(websocket_manager.json, "dumps", lambda obj: calls.append(obj) or real_dumps(obj))
+
+    await manager.broadcast_to_shipment({"type": "location_update", "shipment_id": 7}, 7)
+    await asyncio.sleep(0)
+
+    assert len(calls) == 1
+    for websocket in sockets:
+        assert websocket.sent[-1] == {"type": "location_update", "shipment_id": 7}
+
+    for index in range(5):
+        manager.disconnect(f"client-{index}")
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_evicted():
+    """A stalled client overflows its queue and is dropped without delaying others"""
+    manager = ConnectionManager()
+    manager.max_queue_size = 3
+    fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+    await manager.connect(fast, "fast")
+    await manager.connect(slow, "slow")
+    await subscribe(manager, "fast", 1)
+    await subscribe(manager, "slow", 1)
+
+    for sequence in range(10):
+        await manager.broadcast_to_shipment({"seq": sequence}, 1)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert [message["seq"] for message in fast.sent[1:]] == list(range(10))
+    assert "slow" not in manager.active_connections
+    assert manager.shipment_subscriptions[1] == {"fast"}
+    assert slow.closed_with == 1013
+
+    manager.disconnect("fast")
+
+
+@pytest.mark.asyncio
+async def test_socket_broker_relays_between_workers():
+    """A broadcast on one worker reaches subscribers connected to another worker"""
+    from app.core.broadcast import BroadcastBroker, SocketBrokerBackend
+
+    broker = BroadcastBroker()
+    host, port = await broker.start("127.0.0.1", 0)
+    worker_a, worker_b = ConnectionManager(), ConnectionManager()
+    await worker_a.start_backend(SocketBrokerBackend(host, port))
+    await worker_b.start_backend(SocketBrokerBackend(host, port))
+
+    watcher = FakeWebSocket()
+    await worker_b.connect(watcher, "watcher")
+    worker_b.client_subscriptions["watcher"].add(42)
+    worker_b.shipment_subscriptions[42] = {"watcher"}
+    await worker_b.backend.subscribe(42)
+    await asyncio.sleep(0.05)
+
+    # Only worker B has local subscribers, so only it is subscribed upstream
+    assert set(broker.subscribers) == {42} and len(broker.subscribers[42]) == 1
+
+    await worker_a.broadcast_to_shipment({"type": "status_update", "shipment_id": 42}, 42)
+    for _ in range(50):
+        if len(watcher.sent) > 1:
+            break
+        await asyncio.sleep(0.01)
+    assert watcher.sent[-1] == {"type": "status_update", "shipment_id": 42}
+
+    worker_b.disconnect("watcher")
+    await asyncio.sleep(0.05)
+    assert broker.subscribers == {}
+
+    await worker_a.stop_backend()
+    await worker_b.stop_backend()
+    await broker.stop()
+
+
+class RecordingBackend:
+    def __init__(self, fail_publish: bool = False):
+        self.subscribed = set()
+        self.fail_publish = fail_publish
+
+    async def start(self, deliver):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def subscribe(self, shipment_id):
+        await asyncio.sleep(0)
+        self.subscribed.add(shipment_id)
+
+    async def unsubscribe(self, shipment_id):
+        await asyncio.sleep(0)
+        self.subscribed.discard(shipment_id)
+
+    async def publish(self, shipment_id, text):
+        if self.fail_publish:
+            raise ConnectionError("backend down")
+
+
+@pytest.mark.asyncio
+async def test_backend_failures_do_not_break_broadcasts():
+    """A failing relay is logged; local subscribers still get the message"""
+    manager = ConnectionManager()
+    await manager.start_backend(RecordingBackend(fail_publish=True))
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "client")
+    await subscribe(manager, "client", 3)
+
+    await manager.broadcast_to_shipment({"type": "status_update", "shipment_id": 3}, 3)
+    await asyncio.sleep(0)
+    assert websocket.sent[-1] == {"type": "status_update", "shipment_id": 3}
+
+    manager.disconnect("client")
+
+
+@pytest.mark.asyncio
+async def test_late_release_keeps_new_upstream_subscription():
+    """Releasing a shipment and re-subscribing straight away leaves it subscribed upstream"""
+    manager = ConnectionManager()
+    backend = RecordingBackend()
+    await manager.start_backend(backend)
+    await manager.connect(FakeWebSocket(), "first")
+    await subscribe(manager, "first", 5)
+    await manager._sync_upstream(5)
+
+    manager.disconnect("first")
+    await manager.connect(FakeWebSocket(), "second")
+    await subscribe(manager, "second", 5)
+    await manager._sync_upstream(5)
+    await asyncio.sleep(0.01)
+
+    assert backend.subscribed == {5}
+    manager.disconnect("second")
+    await asyncio.sleep(0.01)
+    assert backend.subscribed == set()
+
+
+@pytest.mark.asyncio
+async def test_socket_backend_reconnects_and_resubscribes():
+    """After the broker connection drops the backend reconnects and replays its subscriptions"""
+    from app.core.broadcast import BroadcastBroker, SocketBrokerBackend
+
+    broker = BroadcastBroker()
+    host, port = await broker.start("127.0.0.1", 0)
+    received = []
+    backend = SocketBrokerBackend(host, port, retry_delay=0.01)
+    await backend.start(lambda shipment_id, text: received.append((shipment_id, text)))
+    publisher = SocketBrokerBackend(host, port)
+    await publisher.start(lambda shipment_id, text: None)
+    await backend.subscribe(9)
+
+    backend.writer.transport.abort()
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        if not backend.writer.is_closing() and broker.subscribers.get(9):
+            break
+    assert len(broker.subscribers[9]) == 1
+
+    await publisher.publish(9, "after reconnect")
+    for _ in range(50):
+        if received:
+            break
+        await asyncio.sleep(0.01)
+    assert received == [(9, "after reconnect")]
+
+    await backend.stop()
+    await publisher.stop()
+    await broker.stop()